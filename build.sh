@@ -1,2 +1,2 @@
 #!/bin/bash
-python3 src/main.py "/my-project-workspace/"
+python3 src/main.py "/my-project-workspace/" --site-url "https://xr-369.github.io"
@@ -0,0 +1,365 @@
+"""
+Benchmarks for the markdown-to-HTML pipeline.
+
+Generates synthetic corpora, times each pipeline stage and a full site
+build, and reports throughput and peak memory. Results can be written as
+JSON and compared against a saved baseline to catch regressions:
+
+    python3 src/bench.py --json bench.json
+    python3 src/bench.py --baseline bench.json --threshold 0.15
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from block_processing import markdown_to_blocks, block_to_block_type, classify_block, markdown_to_html_node
+from text_processing import text_to_textnodes
+
+WORDS = (
+    "the ring of power was forged in secret by sauron in the fires of mount doom "
+    "while elves and dwarves and men went about their business unaware"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _inline(rng):
+    """A line of prose with a sprinkling of inline markup"""
+    parts = []
+    for _ in range(6):
+        roll = rng.random()
+        if roll < 0.1:
+            parts.append(f"**{_sentence(rng, 2)}**")
+        elif roll < 0.2:
+            parts.append(f"_{_sentence(rng, 2)}_")
+        elif roll < 0.3:
+            parts.append(f"`{rng.choice(WORDS)}`")
+        else:
+            parts.append(_sentence(rng, 4))
+    return " ".join(parts)
+
+
+def _fill(title, size, make_blocks):
+    """A "# title" heading followed by rounds of make_blocks() until the corpus reaches size characters"""
+    blocks = [f"# {title}"]
+    length = len(blocks[0])
+    while length < size:
+        for block in make_blocks():
+            blocks.append(block)
+            length += len(block) + 2
+    return "\n\n".join(blocks)
+
+
+def paragraphs_corpus(rng, size):
+    return _fill("Paragraphs", size, lambda: ["\n".join(_inline(rng) for _ in range(4))])
+
+
+def lists_corpus(rng, size):
+    def make_blocks():
+        items = rng.randint(3, 30)
+        if rng.random() < 0.5:
+            return ["\n".join(f"- {_inline(rng)}" for _ in range(items))]
+        return ["\n".join(f"{i + 1}. {_inline(rng)}" for i in range(items))]
+    return _fill("Lists", size, make_blocks)
+
+
+def links_corpus(rng, size):
+    def make_blocks():
+        links = []
+        for i in range(40):
+            if rng.random() < 0.2:
+                links.append(f"![{rng.choice(WORDS)}](/images/{i}.png)")
+            else:
+                links.append(f"[{_sentence(rng, 2)}](/blog/{rng.choice(WORDS)}/{i})")
+        return [" and ".join(links)]
+    return _fill("Links", size, make_blocks)
+
+
+def code_corpus(rng, size):
+    def make_blocks():
+        body = "\n".join(f"    {_sentence(rng, 6)}();" for _ in range(rng.randint(5, 40)))
+        return [f"```\nfunc main() {{\n{body}\n}}\n```", _inline(rng)]
+    return _fill("Code", size, make_blocks)
+
+
+def _outline(rng, indent, depth):
+    """Lines of a list whose last item nests another list, down to depth levels"""
+    ordered = rng.random() < 0.4
+    start = rng.randint(1, 20) if ordered else 1
+    count = rng.randint(2, 4)
+    lines = []
+    for i in range(count):
+        marker = f"{start + i}. " if ordered else "- "
+        lines.append(f"{' ' * indent}{marker}{_inline(rng)}")
+        if rng.random() < 0.1:
+            # A second paragraph of the item
+            lines.extend(["", f"{' ' * (indent + len(marker))}{_sentence(rng, 8)}"])
+        if depth > 1 and (i == count - 1 or rng.random() < 0.3):
+            lines.extend(_outline(rng, indent + len(marker), depth - 1))
+    return lines
+
+
+def nested_corpus(rng, size):
+    """Deeply nested outlines of ordered and unordered lists, some items with several paragraphs"""
+    return _fill("Nested", size, lambda: ["\n".join(_outline(rng, 0, rng.randint(4, 10)))])
+
+
+def outline_corpus(rng, size):
+    """One long list block climbing to 50 levels deep and back, the worst case for the list parser's stack"""
+    lines = []
+    length = 0
+    depth = 0
+    while length < size:
+        lines.append(f"{'  ' * abs(depth % 100 - 50)}- {_sentence(rng, 6)}")
+        length += len(lines[-1]) + 1
+        depth += 1
+    return "# Outline\n\n" + "\n".join(lines)
+
+
+def mixed_corpus(rng, size):
+    """Many short blocks of every type interleaved, as in reference docs"""
+    def make_blocks():
+        level = rng.randint(2, 6)
+        return [
+            f"{'#' * level} {_sentence(rng, 4)}",
+            "\n".join(f"> {_inline(rng)}" for _ in range(rng.randint(1, 3))),
+            "\n".join(f"- {_sentence(rng, 3)}" for _ in range(rng.randint(2, 5))),
+            _inline(rng),
+        ]
+    return _fill("Mixed", size, make_blocks)
+
+
+def large_corpus(rng, size):
+    """A single very large document mixing everything"""
+    generators = [paragraphs_corpus, lists_corpus, links_corpus, code_corpus, nested_corpus, mixed_corpus]
+    parts = [generator(rng, size // len(generators)) for generator in generators]
+    return "\n\n".join(parts)
+
+
+# name -> (generator, size in bytes at scale 1.0)
+CORPORA = {
+    "paragraphs": (paragraphs_corpus, 200_000),
+    "lists": (lists_corpus, 200_000),
+    "links": (links_corpus, 200_000),
+    "code": (code_corpus, 200_000),
+    "nested": (nested_corpus, 200_000),
+    "outline": (outline_corpus, 200_000),
+    "mixed": (mixed_corpus, 200_000),
+    "large": (large_corpus, 5_000_000),
+}
+
+# Stages that handle one block at a time, also reported per block
+PER_BLOCK_STAGES = {"block_to_block_type", "classify_block"}
+
+
+def best_time(func, repeat):
+    """Return the fastest of repeat runs of func, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pipeline_stages(markdown):
+    """Return (stage name, callable) pairs exercising each pipeline stage on markdown"""
+    blocks = markdown_to_blocks(markdown)
+    inline_texts = [" ".join(block.split("\n")) for block in blocks if not block.startswith("```")]
+    html_node = markdown_to_html_node(markdown)
+
+    def classify():
+        for block in blocks:
+            block_to_block_type(block)
+
+    def classify_and_parse():
+        for block in blocks:
+            classify_block(block)
+
+    def tokenize():
+        for text in inline_texts:
+            text_to_textnodes(text)
+
+    return [
+        ("markdown_to_blocks", lambda: markdown_to_blocks(markdown)),
+        ("block_to_block_type", classify),
+        ("classify_block", classify_and_parse),
+        ("text_to_textnodes", tokenize),
+        ("markdown_to_html_node", lambda: markdown_to_html_node(markdown)),
+        ("to_html", html_node.to_html),
+    ]
+
+
+def peak_memory(func):
+    """Peak traced allocation in bytes while running func once"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_corpus(markdown, repeat):
+    size_mb = len(markdown.encode()) / 1_000_000
+    blocks = len(markdown_to_blocks(markdown))
+    result = {"bytes": len(markdown.encode()), "blocks": blocks, "stages": {}}
+    for name, func in pipeline_stages(markdown):
+        seconds = best_time(func, repeat)
+        result["stages"][name] = {"seconds": seconds, "mb_per_s": size_mb / seconds if seconds else None}
+        if name in PER_BLOCK_STAGES:
+            result["stages"][name]["us_per_block"] = seconds / blocks * 1e6
+    result["peak_memory"] = peak_memory(lambda: markdown_to_html_node(markdown).to_html())
+    return result
+
+
+def bench_site(rng, pages, repeat, page_size=4000):
+    """Time a full generate_pages_recursive build of a synthetic site"""
+    from main import generate_pages_recursive
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        template_path = os.path.join(tmp, "template.html")
+        with open(template_path, 'w') as f:
+            f.write(TEMPLATE)
+        generators = [generator for generator, _ in CORPORA.values() if generator is not large_corpus]
+        total_bytes = 0
+        for i in range(pages):
+            page_dir = os.path.join(content, "blog", f"post-{i}")
+            os.makedirs(page_dir)
+            markdown = rng.choice(generators)(rng, page_size)
+            total_bytes += len(markdown.encode())
+            with open(os.path.join(page_dir, "index.md"), 'w') as f:
+                f.write(markdown)
+
+        def build():
+            # Page-by-page logging would dominate the measurement
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, template_path, os.path.join(tmp, "docs"), "/site/")
+
+        seconds = best_time(build, repeat)
+    return {
+        "pages": pages,
+        "bytes": total_bytes,
+        "seconds": seconds,
+        "pages_per_s": pages / seconds if seconds else None,
+        "mb_per_s": total_bytes / 1_000_000 / seconds if seconds else None,
+    }
+
+
+def run(scale=1.0, repeat=3, pages=200, corpora=None, seed=0):
+    rng = random.Random(seed)
+    results = {"scale": scale, "corpora": {}}
+    for name, (generator, size) in CORPORA.items():
+        if corpora and name not in corpora:
+            continue
+        markdown = generator(rng, int(size * scale))
+        results["corpora"][name] = bench_corpus(markdown, repeat)
+    if pages:
+        results["site"] = bench_site(rng, max(1, int(pages * scale)), repeat)
+    return results
+
+
+def _format_rate(value, unit):
+    return f"{value:10.2f} {unit}" if value is not None else f"{'-':>10} {unit}"
+
+
+def print_report(results):
+    for name, corpus in results["corpora"].items():
+        print(f"{name} ({corpus['bytes'] / 1_000_000:.2f} MB, {corpus['blocks']} blocks, "
+              f"peak {corpus['peak_memory'] / 1_000_000:.1f} MB)")
+        for stage, timing in corpus["stages"].items():
+            line = f"  {stage:24} {timing['seconds'] * 1000:10.2f} ms {_format_rate(timing['mb_per_s'], 'MB/s')}"
+            if "us_per_block" in timing:
+                line += f" {timing['us_per_block']:8.2f} us/block"
+            print(line)
+    site = results.get("site")
+    if site:
+        print(f"site build ({site['pages']} pages, {site['bytes'] / 1_000_000:.2f} MB)")
+        print(f"  {'generate_pages_recursive':24} {site['seconds'] * 1000:10.2f} ms "
+              f"{_format_rate(site['pages_per_s'], 'pages/s')} {_format_rate(site['mb_per_s'], 'MB/s')}")
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare timings with a baseline run. Returns a list of
+    (name, baseline seconds, current seconds) for every timing that got
+    slower by more than threshold (a fraction, e.g. 0.1 for 10%).
+    """
+    timings = {}
+    for name, corpus in results["corpora"].items():
+        for stage, timing in corpus["stages"].items():
+            timings[f"{name}/{stage}"] = timing["seconds"]
+    if "site" in results:
+        timings["site"] = results["site"]["seconds"]
+
+    base_timings = {}
+    for name, corpus in baseline.get("corpora", {}).items():
+        for stage, timing in corpus["stages"].items():
+            base_timings[f"{name}/{stage}"] = timing["seconds"]
+    if "site" in baseline:
+        base_timings["site"] = baseline["site"]["seconds"]
+
+    regressions = []
+    for name, seconds in timings.items():
+        before = base_timings.get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown-to-HTML pipeline")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes and page count")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--pages", type=int, default=200, help="pages in the site build (0 to skip)")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="only run these corpora")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown against the baseline (default 0.10)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = run(args.scale, args.repeat, args.pages, args.corpus)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({after / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
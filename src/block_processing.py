@@ -1,6 +1,16 @@
+import io
+import re
 from enum import Enum
-from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from textnode import text_node_to_html_node
+from htmlnode import LeafNode, ParentNode, RawHTML
+from frontmatter import FRONT_MATTER_FENCE, split_front_matter
+from text_processing import extract_markdown_images
+
+# Whole-block patterns, so a block is checked with one scan instead of per-line tests
+HEADING_PATTERN = re.compile(r"(#{1,6}) ")
+QUOTE_PATTERN = re.compile(r">.*(?:\n>.*)*")
+# A list item line: indentation, then "- " or a number of up to 9 digits and ". "
+LIST_ITEM_PATTERN = re.compile(r"([ \t]*)(?:(-)|(\d{1,9})\.) ")
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -10,85 +20,247 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+def continues_list(block, next_line):
+    """
+    Whether next_line, the first line after blank lines ending block, is
+    another paragraph of one of the block's list items (it is indented)
+    rather than the start of a new block.
+    """
+    return next_line[:1] in (" ", "\t") and LIST_ITEM_PATTERN.match(block) is not None
+
 def markdown_to_blocks(markdown):
-    """Split markdown document into blocks separated by blank lines"""
+    """
+    Split markdown document into blocks separated by blank lines. Indented
+    paragraphs after a list stay in the list's block (see continues_list).
+    """
     normalized_markdown = markdown.replace('\r\n', '\n').replace('\r', '\n')
     blocks = normalized_markdown.split("\n\n")
     processed_blocks = []
+    current = ""
     for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:
-            processed_blocks.append(stripped_block)
+        # Odd runs of newlines leave the extra one at the start of the next piece
+        block = block.lstrip("\n")
+        if current and continues_list(current.strip(), block):
+            current += "\n\n" + block
+            continue
+        if not block.strip():
+            continue
+        if current.strip():
+            processed_blocks.append(current.strip())
+        current = block
+    if current.strip():
+        processed_blocks.append(current.strip())
     return processed_blocks
 
+def iter_blocks(lines):
+    """
+    Lazily yield the same blocks as markdown_to_blocks from an iterable of
+    text chunks, normally the lines of an open file. Line endings ("\r\n"
+    and bare "\r") are normalized as chunks arrive, and only the block being
+    assembled is held in memory.
+    """
+    current = []
+    # A list block held back at a blank line, in case an item continues
+    held = None
+    partial = ""
+    skip_newline = False
+    for chunk in lines:
+        # A "\r\n" split across two chunks is still a single line break
+        if skip_newline and chunk.startswith("\n"):
+            chunk = chunk[1:]
+        skip_newline = chunk.endswith("\r")
+        if "\r" in chunk:
+            chunk = chunk.replace("\r\n", "\n").replace("\r", "\n")
+        pieces = chunk.split("\n")
+        pieces[0] = partial + pieces[0]
+        partial = pieces.pop()
+        for line in pieces:
+            if line:
+                if held is not None:
+                    if continues_list(held, line):
+                        current.append("")
+                    else:
+                        yield held
+                        current = []
+                    held = None
+                current.append(line)
+                continue
+            if held is not None:
+                continue
+            # A blank line ends the block being assembled
+            block = "\n".join(current).strip()
+            if LIST_ITEM_PATTERN.match(block):
+                held = block
+                continue
+            if block:
+                yield block
+            current = []
+    if partial:
+        if held is not None and not continues_list(held, partial):
+            yield held
+            current = []
+        elif held is not None:
+            current.append("")
+        current.append(partial)
+    block = "\n".join(current).strip()
+    if block:
+        yield block
+
+def classify_block(block):
+    """
+    Determine the type of a markdown block from its first character,
+    returning (BlockType, parsed) so renderers need not split the block
+    again. parsed is the heading level, the lines of a code block or quote,
+    the MarkdownList of a list, or None for a paragraph.
+    """
+    first = block[:1]
+    if first == '#':
+        match = HEADING_PATTERN.match(block)
+        if match:
+            return BlockType.HEADING, len(match.group(1))
+    elif first == '`' or first.isspace():
+        lines = block.split('\n')
+        first_line = lines[0].strip()
+        if first_line.startswith('```'):
+            # A single line needs content between its fences
+            if len(lines) == 1:
+                if first_line.endswith('```') and len(first_line) > 6:
+                    return BlockType.CODE, lines
+            elif lines[-1].strip() == '```':
+                return BlockType.CODE, lines
+    elif first == '>':
+        if QUOTE_PATTERN.fullmatch(block):
+            return BlockType.QUOTE, block.split('\n')
+    elif first == '-' or first in "0123456789":
+        markdown_list = parse_list(block)
+        if markdown_list is not None:
+            block_type = BlockType.ORDERED_LIST if markdown_list.ordered else BlockType.UNORDERED_LIST
+            return block_type, markdown_list
+    return BlockType.PARAGRAPH, None
+
+class ListItem:
+    """An item of a MarkdownList: its text paragraphs (lists of lines) and nested lists, in order"""
+    __slots__ = ("content_column", "parts", "loose")
+
+    def __init__(self, content_column, text):
+        # Lines indented at least this far belong to the item
+        self.content_column = content_column
+        self.parts = [[text]]
+        # Items with paragraphs separated by blank lines wrap each in <p>
+        self.loose = False
+
+class MarkdownList:
+    """A parsed list block: its items, and for an ordered list the number it starts at"""
+    __slots__ = ("ordered", "start", "indent", "items")
+
+    def __init__(self, ordered, start, indent):
+        self.ordered = ordered
+        self.start = start
+        self.indent = indent
+        self.items = []
+
+def _columns(whitespace):
+    return len(whitespace.expandtabs(4))
+
+def parse_list(block):
+    """
+    Parse a list block in a single pass over its lines, keeping a stack of
+    the lists that are open. An item line indented to at least the content
+    of the item above starts a nested list. One indented less joins the
+    innermost list whose parent item's content it is still within, closing
+    the lists inside it. Indented lines without a marker continue an
+    item, starting a new paragraph of the item after a blank line. Each
+    line is handled once and each list pushed and popped once, so long
+    outlines parse in linear time. Ordered lists may start at any number
+    but must count up by one, and a list's items must all be of one kind.
+    Returns the outermost MarkdownList, or None if block is not a list.
+    """
+    stack = []
+    blank = False
+    for line in block.split('\n'):
+        if not line.strip():
+            blank = True
+            continue
+        match = LIST_ITEM_PATTERN.match(line)
+        if match is None:
+            indent = _columns(line[:len(line) - len(line.lstrip())])
+            if not stack or indent == 0:
+                return None
+            if blank:
+                # A new paragraph of the deepest item it is indented under
+                while len(stack) > 1 and indent < stack[-1].items[-1].content_column:
+                    stack.pop()
+                item = stack[-1].items[-1]
+                item.loose = True
+                item.parts.append([line])
+            else:
+                # Continues the current paragraph, however it is indented
+                item = stack[-1].items[-1]
+                if isinstance(item.parts[-1], MarkdownList):
+                    item.parts.append([line])
+                else:
+                    item.parts[-1].append(line)
+            blank = False
+            continue
+
+        indent = _columns(match.group(1))
+        if stack and indent < stack[0].indent:
+            return None
+        # Close the lists the item is left of, unless it is still inside the
+        # item holding the innermost one: then it joins that list however
+        # far the list's first item was indented
+        while len(stack) > 1 and indent < stack[-1].indent and indent < stack[-2].items[-1].content_column:
+            stack.pop()
+        ordered = match.group(3) is not None
+        item = ListItem(indent + len(match.group(0)) - len(match.group(1)), line[match.end():])
+        if stack and indent < stack[-1].items[-1].content_column:
+            # Another item of the innermost open list
+            current = stack[-1]
+            if current.ordered != ordered:
+                return None
+            if ordered and int(match.group(3)) != current.start + len(current.items):
+                return None
+            current.items.append(item)
+        else:
+            # The first item of a new list, nested in the item above if any
+            nested = MarkdownList(ordered, int(match.group(3)) if ordered else 1, indent)
+            nested.items.append(item)
+            if stack:
+                parent = stack[-1].items[-1]
+                if blank:
+                    parent.loose = True
+                parent.parts.append(nested)
+            stack.append(nested)
+        blank = False
+    return stack[0] if stack else None
+
 def block_to_block_type(block):
     """Determine the type of a markdown block"""
-    lines = block.split('\n')
-    
-    if block.startswith(('# ', '## ', '### ', '#### ', '##### ', '###### ')):
-        return BlockType.HEADING
-    
-    # FIXED: Handle both single-line and multi-line code blocks
-    if len(lines) >= 1:
-        first_line_clean = lines[0].strip()
-        last_line_clean = lines[-1].strip()
-        
-        # For single-line blocks, check if entire block is wrapped in ```
-        if len(lines) == 1:
-            if (first_line_clean.startswith('```') and 
-                first_line_clean.endswith('```') and
-                len(first_line_clean) > 6):  # Make sure there's content between ```
-                return BlockType.CODE
-        # For multi-line blocks, check if first line starts with ``` and last line equals ```
-        else:
-            if (first_line_clean.startswith('```') and 
-                last_line_clean == '```'):
-                return BlockType.CODE
-    
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
-    
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
-    
-    if len(lines) > 0:
-        is_ordered = True
-        for i, line in enumerate(lines):
-            expected_prefix = f"{i+1}. "
-            if not line.startswith(expected_prefix):
-                is_ordered = False
-                break
-        if is_ordered:
-            return BlockType.ORDERED_LIST
-    
-    return BlockType.PARAGRAPH
+    return classify_block(block)[0]
 
-def text_to_children(text):
+def text_to_children(text, resolve_url=None, images=None):
     """Convert markdown text to a list of HTMLNodes for inline elements"""
     from text_processing import text_to_textnodes
     text_nodes = text_to_textnodes(text)
     html_nodes = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolve_url, images)
         html_nodes.append(html_node)
     return html_nodes
 
-def heading_to_html(block):
+def heading_to_html(block, resolve_url=None, images=None, level=None):
     """Convert heading block to HTMLNode"""
-    level = 0
-    for char in block:
-        if char == '#':
-            level += 1
-        else:
-            break
-    
+    if level is None:
+        level = len(block) - len(block.lstrip('#'))
+
     content = block[level:].strip()
-    children = text_to_children(content)
+    children = text_to_children(content, resolve_url, images)
     return ParentNode(f"h{level}", children)
 
-def code_to_html(block):
+def code_to_html(block, lines=None):
     """Convert code block to HTMLNode"""
-    lines = block.split('\n')
+    if lines is None:
+        lines = block.split('\n')
     
     # Handle single-line code blocks (```code```)
     if len(lines) == 1:
@@ -106,73 +278,187 @@ def code_to_html(block):
     code_node = LeafNode("code", content)
     return ParentNode("pre", [code_node])
 
-def quote_to_html(block):
+def quote_to_html(block, resolve_url=None, images=None, lines=None):
     """Convert quote block to HTMLNode"""
-    lines = block.split('\n')
+    if lines is None:
+        lines = block.split('\n')
     # Remove > from each line and strip, then join with spaces
     content_lines = [line[1:].strip() for line in lines]
     content = ' '.join(content_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, resolve_url, images)
     return ParentNode("blockquote", children)
 
-def unordered_list_to_html(block):
-    """Convert unordered list block to HTMLNode"""
-    lines = block.split('\n')
+def list_to_html(markdown_list, resolve_url=None, images=None):
+    """Convert a MarkdownList, with its nested lists, to a "ul" or "ol" HTMLNode"""
     list_items = []
-    for line in lines:
-        # Remove "- " from start and convert content
-        content = line[2:].strip()
-        children = text_to_children(content)
+    for item in markdown_list.items:
+        children = []
+        for part in item.parts:
+            if isinstance(part, MarkdownList):
+                children.append(list_to_html(part, resolve_url, images))
+                continue
+            content = ' '.join(line.strip() for line in part)
+            inline = text_to_children(content, resolve_url, images)
+            if item.loose:
+                children.append(ParentNode("p", inline))
+            else:
+                children.extend(inline)
         list_items.append(ParentNode("li", children))
-    return ParentNode("ul", list_items)
+    if not markdown_list.ordered:
+        return ParentNode("ul", list_items)
+    props = {"start": str(markdown_list.start)} if markdown_list.start != 1 else None
+    return ParentNode("ol", list_items, props)
+
+def unordered_list_to_html(block, resolve_url=None, images=None, parsed=None):
+    """Convert unordered list block to HTMLNode"""
+    return list_to_html(parsed or _parse_list_block(block), resolve_url, images)
 
-def ordered_list_to_html(block):
+def ordered_list_to_html(block, resolve_url=None, images=None, parsed=None):
     """Convert ordered list block to HTMLNode"""
-    lines = block.split('\n')
-    list_items = []
-    for line in lines:
-        # Remove "X. " from start (where X is the number)
-        content = line.split('. ', 1)[1].strip()
-        children = text_to_children(content)
-        list_items.append(ParentNode("li", children))
-    return ParentNode("ol", list_items)
+    return list_to_html(parsed or _parse_list_block(block), resolve_url, images)
+
+def _parse_list_block(block):
+    markdown_list = parse_list(block)
+    if markdown_list is None:
+        raise ValueError("invalid markdown list")
+    return markdown_list
 
-def paragraph_to_html(block):
+def paragraph_to_html(block, resolve_url=None, images=None):
     """Convert paragraph block to HTMLNode"""
     # Join lines with spaces to remove internal newlines
-    content = ' '.join(block.split('\n'))
-    children = text_to_children(content)
+    content = block.replace('\n', ' ')
+    children = text_to_children(content, resolve_url, images)
     return ParentNode("p", children)
 
-def markdown_to_html_node(markdown):
-    """Convert full markdown document to a single parent HTMLNode"""
-    blocks = markdown_to_blocks(markdown)
+def block_to_html_node(block, resolve_url=None, images=None):
+    """Convert a single markdown block to an HTMLNode"""
+    block_type, parsed = classify_block(block)
+
+    if block_type == BlockType.HEADING:
+        return heading_to_html(block, resolve_url, images, parsed)
+    elif block_type == BlockType.CODE:
+        return code_to_html(block, parsed)
+    elif block_type == BlockType.QUOTE:
+        return quote_to_html(block, resolve_url, images, parsed)
+    elif block_type == BlockType.UNORDERED_LIST:
+        return unordered_list_to_html(block, resolve_url, images, parsed)
+    elif block_type == BlockType.ORDERED_LIST:
+        return ordered_list_to_html(block, resolve_url, images, parsed)
+    else:  # PARAGRAPH
+        return paragraph_to_html(block, resolve_url, images)
+
+def heading_level_and_text(block):
+    """
+    Return (level, text) for a heading block, where text is the heading's
+    first line, or None if the block is not a heading.
+    """
+    level = len(block) - len(block.lstrip('#'))
+    if 1 <= level <= 6 and block[level:level + 1] == ' ':
+        return level, block[level:].split('\n', 1)[0].strip()
+    return None
+
+class Document:
+    """
+    Metadata collected while a document's blocks are parsed: the front
+    matter, the title (front matter title, else the first h1), the heading
+    outline, block and word counts, and the URLs of the images the document
+    embeds. node holds the rendered HTMLNode
+    when the whole document was built in memory.
+    """
+
+    def __init__(self, metadata=None):
+        self.node = None
+        self.metadata = metadata or {}
+        title = self.metadata.get("title")
+        self.title = str(title) if title is not None else None
+        self.headings = []
+        self.block_count = 0
+        self.word_count = 0
+        self.image_urls = set()
+
+    def add_block(self, block):
+        """Record what this block contributes to the document's metadata"""
+        self.block_count += 1
+        self.word_count += len(block.split())
+        if "![" in block:
+            self.image_urls.update(url for _, url in extract_markdown_images(block))
+        if block.startswith('#'):
+            heading = heading_level_and_text(block)
+            if heading is not None:
+                self.headings.append(heading)
+                if heading[0] == 1 and self.title is None:
+                    self.title = heading[1]
+
+def render_block(block, resolve_url=None, cache=None, minifier=None, images=None):
+    """
+    Convert a single markdown block to an HTMLNode. With a BlockCache, a
+    block rendered before is reused as raw HTML, and a new one is rendered
+    and added to the cache. A minifier is only used to serialize blocks for
+    the cache, which must then have been created for minified output; a
+    cache hit adds the bytes the block's minifying saved to it.
+    With an ImageCatalog, images get their size, lazy loading and srcset,
+    and a cached block is only reused while its images are unchanged.
+    """
+    if cache is None:
+        return block_to_html_node(block, resolve_url, images)
+    key = block
+    if images is not None and "![" in block:
+        key += "".join(f"\0{images.stamp(url)}" for _, url in extract_markdown_images(block))
+    entry = cache.get(key)
+    if entry is not None:
+        html, saved = entry
+        if minifier is not None:
+            minifier.saved += saved
+        return RawHTML(html)
+    before = minifier.saved if minifier is not None else 0
+    buffer = io.StringIO()
+    block_to_html_node(block, resolve_url, images).write_html(buffer, minifier)
+    html = buffer.getvalue()
+    cache.put(key, html, minifier.saved - before if minifier is not None else 0)
+    return RawHTML(html)
+
+def blocks_to_html_node(blocks, resolve_url=None, cache=None, images=None):
+    """Convert already-split markdown blocks to a single parent HTMLNode"""
+    return ParentNode("div", [render_block(block, resolve_url, cache, images=images) for block in blocks])
+
+def markdown_to_html_node(markdown, resolve_url=None, cache=None, images=None):
+    """
+    Convert full markdown document to a single parent HTMLNode.
+    resolve_url, when given, is applied to every link and image URL; the
+    cache, if any, must have been created for the same resolver.
+    """
+    return blocks_to_html_node(markdown_to_blocks(markdown), resolve_url, cache, images)
+
+def markdown_to_document(markdown, resolve_url=None, cache=None, images=None):
+    """
+    Parse a markdown document in a single block pass, returning a Document
+    with the rendered node along with its front matter, title and outline.
+    """
+    metadata = {}
+    if markdown.startswith(FRONT_MATTER_FENCE):
+        metadata, lines = split_front_matter(markdown.splitlines(keepends=True))
+        markdown = "".join(lines)
+    document = Document(metadata)
     html_blocks = []
-    
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.HEADING:
-            html_blocks.append(heading_to_html(block))
-        elif block_type == BlockType.CODE:
-            html_blocks.append(code_to_html(block))
-        elif block_type == BlockType.QUOTE:
-            html_blocks.append(quote_to_html(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            html_blocks.append(unordered_list_to_html(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            html_blocks.append(ordered_list_to_html(block))
-        else:  # PARAGRAPH
-            html_blocks.append(paragraph_to_html(block))
-    
-    return ParentNode("div", html_blocks)
+    for block in markdown_to_blocks(markdown):
+        document.add_block(block)
+        html_blocks.append(render_block(block, resolve_url, cache, images=images))
+    document.node = ParentNode("div", html_blocks)
+    return document
 
 def extract_title(markdown):
     """
     Extract the h1 header from markdown content.
     Raises Exception if no h1 header is found.
     """
-    lines = markdown.split('\n')
+    return extract_title_from_lines(markdown.split('\n'))
+
+def extract_title_from_lines(lines):
+    """
+    Extract the h1 header from an iterable of lines, such as an open file,
+    stopping at the first match.
+    Raises Exception if no h1 header is found.
+    """
     for line in lines:
         stripped = line.strip()
         if stripped.startswith('# '):
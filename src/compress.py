@@ -0,0 +1,121 @@
+import gzip
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from profiling import NULL_PROFILER
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_SUFFIXES = frozenset({
+    ".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map", ".webmanifest",
+})
+# Below this the compressed file saves less than a network packet
+MIN_COMPRESS_SIZE = 1024
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def _gzip(src_path, dest_path):
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as raw:
+        # mtime=0 keeps the output identical for identical input
+        with gzip.GzipFile(filename="", mode='wb', compresslevel=9, fileobj=raw, mtime=0) as dest:
+            shutil.copyfileobj(src, dest, 1 << 20)
+
+
+def _brotli(src_path, dest_path):
+    compressor = brotli.Compressor(quality=11)
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+        for chunk in iter(lambda: src.read(1 << 20), b""):
+            dest.write(compressor.process(chunk))
+        dest.write(compressor.finish())
+
+
+def encoders():
+    """(suffix, function) for every encoding available in this environment"""
+    available = [(".gz", _gzip)]
+    if brotli is not None:
+        available.append((".br", _brotli))
+    return available
+
+
+def should_compress(path, size):
+    return size >= MIN_COMPRESS_SIZE and os.path.splitext(path)[1].lower() in COMPRESSIBLE_SUFFIXES
+
+
+def remove_compressed(path, keep=()):
+    """Delete the compressed siblings of path, except those with a suffix in keep"""
+    for suffix in COMPRESSED_SUFFIXES:
+        if suffix not in keep:
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def precompress_file(path):
+    """
+    Write .gz (and .br) siblings of path if it is a compressible file above
+    the size threshold. Siblings are given the source's mtime, so one whose
+    mtime still matches is up to date and skipped. Siblings that would no
+    longer be written (the file shrank, or brotli went away) are deleted,
+    so servers never pick up a stale one.
+    Returns the number of siblings written.
+    """
+    st = os.stat(path)
+    if not should_compress(path, st.st_size):
+        remove_compressed(path)
+        return 0
+    available = encoders()
+    remove_compressed(path, keep={suffix for suffix, _ in available})
+    written = 0
+    for suffix, encode in available:
+        sibling = path + suffix
+        try:
+            if os.stat(sibling).st_mtime_ns == st.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        tmp_path = sibling + ".tmp"
+        try:
+            encode(path, tmp_path)
+            os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp_path, sibling)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        written += 1
+    return written
+
+
+class Precompressor:
+    """
+    Compresses files in a thread pool as they are submitted, so compression
+    overlaps with rendering and copying (zlib and brotli release the GIL).
+    """
+
+    def __init__(self, workers=4, profiler=None):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.profiler = profiler or NULL_PROFILER
+        self.futures = []
+
+    def submit(self, path):
+        self.futures.append(self.pool.submit(self._compress, path))
+
+    def _compress(self, path):
+        with self.profiler.stage("compress"):
+            written = precompress_file(path)
+        self.profiler.count("compressed_files", written)
+        return written
+
+    def wait(self):
+        """Wait for every file submitted so far; returns the number of siblings written"""
+        futures, self.futures = self.futures, []
+        return sum(future.result() for future in futures)
+
+    def close(self):
+        written = self.wait()
+        self.pool.shutdown()
+        return written
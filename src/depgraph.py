@@ -0,0 +1,62 @@
+class DependencyGraph:
+    """
+    What every generated output was built from, for incremental builds.
+
+    Each output records the dependencies it used, as "kind:name" keys
+    ("source:content/index.md", "template:template.html",
+    "image:/images/a.png"), together with the stamp (content hash or other
+    fingerprint) each had at the time. A reverse index from dependency to
+    outputs lets a build look up every dependency's current stamp once and
+    find exactly the outputs built against an older one.
+    """
+
+    def __init__(self, edges=None):
+        # output -> {dependency key: stamp when the output was built}
+        self.edges = edges or {}
+        self.reverse = {}
+        for output, dependencies in self.edges.items():
+            for key in dependencies:
+                self.reverse.setdefault(key, set()).add(output)
+
+    def __contains__(self, output):
+        return output in self.edges
+
+    def __len__(self):
+        return len(self.edges)
+
+    def set_dependencies(self, output, stamps):
+        """Replace what output depends on with stamps, a {key: stamp} dict"""
+        self.remove(output)
+        self.edges[output] = dict(stamps)
+        for key in stamps:
+            self.reverse.setdefault(key, set()).add(output)
+
+    def remove(self, output):
+        """Forget output, so the next build treats it as having unknown dependencies"""
+        for key in self.edges.pop(output, ()):
+            dependents = self.reverse[key]
+            dependents.discard(output)
+            if not dependents:
+                del self.reverse[key]
+
+    def dependents(self, key):
+        """Outputs that depend on key"""
+        return set(self.reverse.get(key, ()))
+
+    def dirty(self, stamp, kinds):
+        """
+        Return the outputs with a dependency of one of kinds whose current
+        stamp differs from the one it was built against. stamp(key) returns
+        a dependency's current stamp (None if it no longer exists) and is
+        called once per dependency, however many outputs share it.
+        """
+        dirty = set()
+        for key, outputs in self.reverse.items():
+            if key.partition(":")[0] not in kinds:
+                continue
+            current = stamp(key)
+            dirty.update(output for output in outputs if self.edges[output][key] != current)
+        return dirty
+
+    def to_data(self):
+        return self.edges
@@ -0,0 +1,247 @@
+import ctypes
+import ctypes.util
+import functools
+import os
+import select
+import struct
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+LIVERELOAD_PATH = "/__livereload"
+
+# Long-polls the server for a new build version and reloads the page when one lands
+LIVERELOAD_SCRIPT = """<script>
+(function () {
+  var version = null;
+  function poll() {
+    fetch("%s?version=" + (version === null ? "" : version))
+      .then(function (r) { return r.text(); })
+      .then(function (v) {
+        if (version !== null && v !== version) { location.reload(); return; }
+        version = v;
+        poll();
+      })
+      .catch(function () { setTimeout(poll, 1000); });
+  }
+  poll();
+})();
+</script>""" % LIVERELOAD_PATH
+
+
+class PollingWatcher:
+    """
+    Detects changes by periodically comparing the size and mtime of every
+    file under the watched roots. Works everywhere, at the cost of a stat per
+    file per interval.
+    """
+
+    def __init__(self, roots, interval=0.5):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                paths = [root]
+            else:
+                paths = (os.path.join(d, f) for d, _, files in os.walk(root) for f in files)
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self):
+        """Block until something changes, then return the set of changed or deleted paths"""
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._scan()
+            changed = {path for path, info in snapshot.items() if self.snapshot.get(path) != info}
+            changed.update(path for path in self.snapshot if path not in snapshot)
+            self.snapshot = snapshot
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher. Directories are watched recursively (new
+    subdirectories are picked up as they appear); a file root is watched
+    through its parent directory so editors that save by renaming still
+    trigger events.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+                  | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, roots, debounce=0.05):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.debounce = debounce
+        self.watches = {}
+        # Parent directory -> file names watched there, for file roots
+        self.file_filters = {}
+        for root in roots:
+            if os.path.isdir(root):
+                self._watch_tree(root)
+            else:
+                parent = os.path.dirname(root) or "."
+                self.file_filters.setdefault(parent, set()).add(os.path.basename(root))
+                self._add_watch(parent)
+
+    def _add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.watches[wd] = path
+
+    def _watch_tree(self, root):
+        """Watch root and every directory under it, returning the files found"""
+        found = []
+        for directory, _, files in os.walk(root):
+            self._add_watch(directory)
+            found.extend(os.path.join(directory, f) for f in files)
+        return found
+
+    def _read_events(self, changed):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            wanted = self.file_filters.get(directory)
+            if wanted is not None and name not in wanted:
+                continue
+            path = os.path.join(directory, name)
+            changed.add(path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # Files can land in a new directory before its watch exists
+                changed.update(self._watch_tree(path))
+
+    def wait(self):
+        """Block until something changes, then return the set of changed or deleted paths"""
+        changed = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            self._read_events(changed)
+        # Editors often save in several steps; gather them into one batch
+        while select.select([self.fd], [], [], self.debounce)[0]:
+            self._read_events(changed)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(roots):
+    """Return an inotify watcher where the platform supports it, otherwise a polling one"""
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError):
+        return PollingWatcher(roots)
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Static file handler that injects the live-reload script into HTML pages"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] == LIVERELOAD_PATH:
+            self.send_livereload()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        script = LIVERELOAD_SCRIPT.encode()
+        marker = body.rfind(b"</body>")
+        body = body[:marker] + script + body[marker:] if marker >= 0 else body + script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_livereload(self):
+        query = self.path.split("?", 1)[1] if "?" in self.path else ""
+        known = query.split("version=", 1)[1] if "version=" in query else ""
+        version = str(self.server.wait_for_build(known))
+        body = version.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DevServer(ThreadingHTTPServer):
+    """
+    In-process HTTP server for the output directory. Browsers long-poll
+    LIVERELOAD_PATH and reload when notify_reload bumps the build version.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory, port=8888, host="localhost"):
+        handler = functools.partial(LiveReloadHandler, directory=directory)
+        super().__init__((host, port), handler)
+        self.version = 0
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def wait_for_build(self, known, timeout=25):
+        """Return the build version once it differs from known, or after timeout"""
+        with self.condition:
+            self.condition.wait_for(lambda: str(self.version) != known, timeout)
+            return self.version
+
+    def notify_reload(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
@@ -0,0 +1,187 @@
+import heapq
+import os
+import re
+import urllib.parse
+from xml.sax.saxutils import escape, quoteattr
+from outputs import AtomicOutput
+from urls import make_url_resolver
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+# Limits from the sitemaps.org protocol; larger sites get a sitemap index
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+FEED_SIZE = 20
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+# YYYY-MM-DD, optionally with a time (seconds optional) and a time zone
+ATOM_DATE_PATTERN = re.compile(
+    r"(\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01]))"
+    r"(?:T([01]\d|2[0-3]):([0-5]\d)(:[0-5]\d(?:\.\d+)?)?)?(Z|[+-]\d{2}:\d{2})?"
+)
+
+SITEMAP_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAP_FOOTER = "</urlset>\n"
+
+
+def is_site_url(site_url):
+    """Whether site_url is an absolute http(s) URL with a host, as sitemaps and feeds require"""
+    parts = urllib.parse.urlsplit(site_url)
+    return parts.scheme in ("http", "https") and bool(parts.netloc)
+
+
+def make_absolute_url(basepath, site_url):
+    """
+    Return a function mapping a site-relative URL ("/blog/tom/") to the
+    absolute URL it is published at: the basepath applied, prefixed with
+    site_url ("https://example.com").
+    Raises ValueError if site_url is not an absolute URL.
+    """
+    if not is_site_url(site_url):
+        raise ValueError(f"site URL must be absolute, e.g. https://example.com: {site_url!r}")
+    resolve_url = make_url_resolver(basepath)
+    site_url = site_url.rstrip("/")
+
+    def absolute_url(url):
+        return site_url + resolve_url(url)
+    return absolute_url
+
+
+def w3c_date(date):
+    """The YYYY-MM-DD part of a front matter date, or None"""
+    if date and DATE_PATTERN.match(date):
+        return date[:10]
+    return None
+
+
+def atom_date(date):
+    """
+    A front matter date as an RFC 3339 timestamp, assuming midnight UTC when
+    no time or time zone is given, or None if it is not a date
+    """
+    match = ATOM_DATE_PATTERN.fullmatch(date.strip()) if date else None
+    if match is None:
+        return None
+    day, hours, minutes, seconds, zone = match.groups()
+    return f"{day}T{hours or '00'}:{minutes or '00'}{seconds or ':00'}{zone or 'Z'}"
+
+
+def _feed_entries(entries):
+    """The entries with a date, warning about and skipping those whose date is not valid"""
+    for entry in entries:
+        if not entry["date"]:
+            continue
+        if atom_date(entry["date"]) is None:
+            print(f"Leaving {entry['url']} out of the feed: invalid date {entry['date']!r}")
+            continue
+        yield entry
+
+
+def write_sitemaps(urls, dest_dir, absolute_url, max_urls=SITEMAP_MAX_URLS):
+    """
+    Write (url, date) pairs to dest_dir/sitemap.xml. Once a sitemap reaches
+    max_urls URLs or the size limit, further URLs go to a new sitemap file,
+    and sitemap.xml becomes a sitemap index pointing at them. The first
+    sitemap's entries are held until it is known whether an index is
+    needed; later ones are streamed to disk, so memory use is bounded by
+    one sitemap. Files whose content is unchanged keep their mtime.
+    Returns the number of URLs written.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+
+    def part_path(number):
+        return os.path.join(dest_dir, f"sitemap-{number}.xml")
+
+    # Entries of the first sitemap, until it overflows into sitemap-1.xml
+    first = [SITEMAP_HEADER]
+    writer = None
+    parts = 0
+    size = len(SITEMAP_HEADER)
+    in_part = total = 0
+    for url, date in urls:
+        entry = f"  <url><loc>{escape(absolute_url(url))}</loc>"
+        lastmod = w3c_date(date)
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        entry += "</url>\n"
+        entry_size = len(entry.encode())
+        if in_part >= max_urls or size + entry_size + len(SITEMAP_FOOTER) > SITEMAP_MAX_BYTES:
+            if writer is None:
+                parts = 1
+                writer = AtomicOutput(part_path(parts))
+                writer.write("".join(first))
+                first = None
+            writer.write(SITEMAP_FOOTER)
+            writer.close()
+            parts += 1
+            writer = AtomicOutput(part_path(parts))
+            writer.write(SITEMAP_HEADER)
+            size = len(SITEMAP_HEADER)
+            in_part = 0
+        if writer is None:
+            first.append(entry)
+        else:
+            writer.write(entry)
+        size += entry_size
+        in_part += 1
+        total += 1
+
+    with AtomicOutput(os.path.join(dest_dir, SITEMAP_NAME)) as sitemap:
+        if writer is None:
+            # A single sitemap needs no index
+            sitemap.write("".join(first))
+            sitemap.write(SITEMAP_FOOTER)
+        else:
+            writer.write(SITEMAP_FOOTER)
+            writer.close()
+            sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                          '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for number in range(1, parts + 1):
+                sitemap.write(f"  <sitemap><loc>{escape(absolute_url(f'/sitemap-{number}.xml'))}</loc></sitemap>\n")
+            sitemap.write("</sitemapindex>\n")
+
+    # Parts left over from an earlier, larger build
+    number = parts + 1
+    while os.path.exists(part_path(number)):
+        os.remove(part_path(number))
+        number += 1
+    return total
+
+
+def write_atom_feed(entries, path, absolute_url, title, size=FEED_SIZE):
+    """
+    Write an Atom feed of the size newest dated entries (site index
+    entries). heapq.nlargest keeps only size entries in memory however
+    many are passed in. Entries whose date is not valid are left out with
+    a warning. Without dated entries the feed would have no
+    <updated> time, so nothing is written. Returns the number of entries
+    in the feed.
+    """
+    newest = heapq.nlargest(size, _feed_entries(entries),
+                            key=lambda entry: (entry["date"], entry["url"]))
+    if not newest:
+        return 0
+    feed_id = absolute_url("/")
+    updated = atom_date(newest[0]["date"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = AtomicOutput(path)
+    writer.write('<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+    writer.write(f"  <title>{escape(title)}</title>\n")
+    writer.write(f"  <id>{escape(feed_id)}</id>\n")
+    writer.write(f"  <link href={quoteattr(feed_id)} />\n")
+    writer.write(f"  <link rel=\"self\" href={quoteattr(absolute_url('/' + os.path.basename(path)))} />\n")
+    writer.write(f"  <updated>{updated}</updated>\n")
+    writer.write(f"  <author><name>{escape(title)}</name></author>\n")
+    for entry in newest:
+        url = absolute_url(entry["url"])
+        writer.write("  <entry>\n")
+        writer.write(f"    <title>{escape(entry['title'] or url)}</title>\n")
+        writer.write(f"    <link href={quoteattr(url)} />\n")
+        writer.write(f"    <id>{escape(url)}</id>\n")
+        writer.write(f"    <updated>{atom_date(entry['date'])}</updated>\n")
+        for tag in entry["tags"]:
+            writer.write(f"    <category term={quoteattr(tag)} />\n")
+        writer.write("  </entry>\n")
+    writer.write("</feed>\n")
+    writer.close()
+    return len(newest)
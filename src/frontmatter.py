@@ -0,0 +1,91 @@
+import itertools
+import re
+
+FRONT_MATTER_FENCE = "---"
+
+KEY_PATTERN = re.compile(r"([A-Za-z_][\w-]*)\s*:(?:\s+(.*))?$")
+INT_PATTERN = re.compile(r"-?\d+$")
+
+
+def split_front_matter(lines):
+    """
+    Read the front matter block from the start of an iterable of lines.
+    Front matter is a run of `key: value` lines fenced by `---` lines, and
+    must start on the very first line. Returns (metadata, remaining lines),
+    consuming nothing past the closing fence, so a file object can be
+    handed over and the rest of it still streamed. Without a closing fence
+    the opening `---` is ordinary markdown and every line is kept.
+    Raises ValueError if the front matter cannot be parsed.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip("\r\n") != FRONT_MATTER_FENCE:
+        return {}, itertools.chain([first], lines)
+    collected = []
+    for line in lines:
+        if line.rstrip("\r\n") == FRONT_MATTER_FENCE:
+            return parse_front_matter(collected), lines
+        collected.append(line)
+    return {}, itertools.chain([first], collected)
+
+
+def parse_front_matter(lines):
+    """
+    Parse the YAML subset used in front matter into a dict: one `key: value`
+    per line, where a value is a string (optionally quoted), an integer,
+    true/false or an inline [list]. A key with no value followed by
+    `- item` lines holds a list. Blank lines and # comments are ignored.
+    """
+    metadata = {}
+    list_key = None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") or stripped == "-":
+            if list_key is None:
+                raise ValueError(f"Front matter line {number}: list item outside a list")
+            if metadata[list_key] is None:
+                metadata[list_key] = []
+            metadata[list_key].append(parse_scalar(stripped[1:].strip()))
+            continue
+        match = KEY_PATTERN.match(stripped)
+        if match is None:
+            raise ValueError(f"Front matter line {number}: expected 'key: value', got {stripped!r}")
+        key, value = match.groups()
+        if value is None or not value.strip():
+            # The value, if any, is a list on the following lines
+            metadata[key] = None
+            list_key = key
+        else:
+            metadata[key] = parse_value(value.strip())
+            list_key = None
+    return metadata
+
+
+def parse_value(text):
+    """Parse a front matter value: an inline [list] or a scalar"""
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        if not inner:
+            return []
+        return [parse_scalar(item.strip()) for item in inner.split(",")]
+    return parse_scalar(text)
+
+
+def parse_scalar(text):
+    """Parse a quoted or bare string, integer or boolean"""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    # Unquoted values may carry a trailing comment
+    text = text.split(" #", 1)[0].rstrip()
+    if INT_PATTERN.match(text):
+        return int(text)
+    lowered = text.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    return text
@@ -1,13 +1,68 @@
+import io
+import re
+
+# Elements that have no content and no closing tag
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+# Elements whose whitespace is significant, left untouched when minifying
+PRESERVE_WHITESPACE = frozenset({"pre", "code", "textarea", "script", "style"})
+# ASCII only: a non-breaking space is content, so every character dropped is one byte
+COLLAPSIBLE_WHITESPACE_PATTERN = re.compile(r"\s{2,}|[\t\n\r\f]", re.ASCII)
+UNQUOTED_VALUE_PATTERN = re.compile(r"[^\s\"'=<>`]+")
+
+
+class Minifier:
+    """
+    Passed to write_html to serialize minimal HTML: whitespace runs in text
+    collapse to one space, attribute values that need no quotes lose them,
+    and void elements get no closing tag. Keeps a tally of the bytes left
+    out.
+    """
+    __slots__ = ("saved",)
+
+    def __init__(self):
+        self.saved = 0
+
+    def text(self, value):
+        collapsed = COLLAPSIBLE_WHITESPACE_PATTERN.sub(" ", value)
+        self.saved += len(value) - len(collapsed)
+        return collapsed
+
+    def props(self, props):
+        if not props:
+            return ""
+        props_html = ""
+        for prop, value in props.items():
+            value = str(value)
+            if UNQUOTED_VALUE_PATTERN.fullmatch(value):
+                props_html += f" {prop}={value}"
+                self.saved += 2
+            else:
+                props_html += f' {prop}="{value}"'
+        return props_html
+
+
 class HTMLNode:
+    # Documents allocate one node per inline span, so skip the per-instance dict
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, minifier=None):
         raise NotImplementedError("to_html method not implemented")
 
+    def write_html(self, stream, minifier=None):
+        """
+        Serialize this node by writing chunks to a text stream (anything with
+        .write). With a Minifier, minimal HTML is written instead.
+        """
+        raise NotImplementedError("write_html method not implemented")
+
     def props_to_html(self):
         if self.props is None:
             return ""
@@ -21,33 +76,95 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+        # Assigned directly rather than through super().__init__: this is the
+        # hottest constructor in the renderer
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
 
-    def to_html(self):
+    def to_html(self, minifier=None):
+        if minifier is not None:
+            buffer = io.StringIO()
+            self.write_html(buffer, minifier)
+            return buffer.getvalue()
         if self.value is None:
             raise ValueError("invalid HTML: no value")
         if self.tag is None:
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def write_html(self, stream, minifier=None):
+        if minifier is None:
+            stream.write(self.to_html())
+            return
+        if self.value is None:
+            raise ValueError("invalid HTML: no value")
+        tag = self.tag
+        if tag is None:
+            stream.write(minifier.text(self.value))
+            return
+        value = self.value if tag in PRESERVE_WHITESPACE else minifier.text(self.value)
+        if tag in VOID_ELEMENTS and not value:
+            stream.write(f"<{tag}{minifier.props(self.props)}>")
+            minifier.saved += len(tag) + 3
+            return
+        stream.write(f"<{tag}{minifier.props(self.props)}>{value}</{tag}>")
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
+class RawHTML(LeafNode):
+    """Already-serialized HTML, written verbatim (and never re-minified)"""
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def write_html(self, stream, minifier=None):
+        stream.write(self.value)
+
+    def __repr__(self):
+        return f"RawHTML({self.value})"
+
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+    def to_html(self, minifier=None):
+        buffer = io.StringIO()
+        self.write_html(buffer, minifier)
+        return buffer.getvalue()
 
-    def to_html(self):
+    def write_html(self, stream, minifier=None):
+        """
+        Walk the tree once, writing each tag and leaf straight to the stream
+        instead of building the children's HTML as intermediate strings.
+        """
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = ""
+        write = stream.write
+        if minifier is None:
+            write(f"<{self.tag}{self.props_to_html()}>")
+        else:
+            write(f"<{self.tag}{minifier.props(self.props)}>")
+            if self.tag in PRESERVE_WHITESPACE:
+                minifier = None
         for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+            child.write_html(stream, minifier)
+        write(f"</{self.tag}>")
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import struct
+from manifest import hash_file
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_CACHE_NAME = "image-cache.json"
+IMAGE_CACHE_VERSION = 1
+IMAGE_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".gif"})
+# Widths of the downscaled variants offered in srcset, when Pillow is available
+VARIANT_WIDTHS = (480, 960, 1600)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers, which carry the image size
+JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+
+
+def image_dimensions(path):
+    """
+    Return (width, height) read from the header of a PNG, GIF or JPEG file,
+    or None if the format is not recognized. Only the header is read.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(26)
+        if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:2] == b"\xff\xd8":
+            return _jpeg_dimensions(f)
+    return None
+
+
+def _jpeg_dimensions(f):
+    """Walk the JPEG segments after the SOI marker until a start-of-frame segment"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            # Markers without a length
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def variant_url(url, width):
+    """URL of the variant of an image scaled to width: /images/a.png -> /images/a-480w.png"""
+    stem, suffix = os.path.splitext(url)
+    return f"{stem}-{width}w{suffix}"
+
+
+class ImageCatalog:
+    """
+    Dimensions (and downscaled variants) of the images under a static
+    directory, keyed by the root-relative URL they are published at.
+
+    Entries are cached on disk together with each image's size, mtime and
+    content hash: an image whose stat is unchanged is not read at all, and
+    one whose content hash is unchanged is not reprocessed.
+    """
+
+    def __init__(self, static_dir, dest_dir, path=None, variants=False):
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.path = path
+        # Variants need Pillow; without it only dimensions are recorded
+        self.variants = variants and Image is not None
+        self.entries = {}
+
+    def load(self):
+        """Add the entries saved at path; a missing or unreadable file is ignored"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == IMAGE_CACHE_VERSION:
+            self.entries = data["images"]
+        return self
+
+    def save(self):
+        data = {"version": IMAGE_CACHE_VERSION, "images": self.entries}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def scan(self):
+        """
+        Bring the catalog up to date with the images under static_dir.
+        Returns (processed, stale outputs): the number of images read and the
+        variant files of images that were removed or changed.
+        """
+        previous, self.entries = self.entries, {}
+        processed = 0
+        stale = []
+        for root, dirs, files in os.walk(self.static_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() not in IMAGE_SUFFIXES:
+                    continue
+                path = os.path.join(root, name)
+                url = "/" + os.path.relpath(path, self.static_dir).replace(os.sep, "/")
+                entry, old_variants = self._update(path, url, previous.pop(url, None))
+                if entry is None:
+                    continue
+                processed += entry.pop("processed", False)
+                stale.extend(old_variants)
+                self.entries[url] = entry
+        for entry in previous.values():
+            stale.extend(self._variant_paths(entry))
+        return processed, stale
+
+    def _update(self, path, url, cached):
+        st = os.stat(path)
+        if cached is not None:
+            if cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns \
+                    and self._variants_current(cached):
+                return cached, []
+            content_hash = hash_file(path)
+            if cached["hash"] == content_hash and self._variants_current(cached):
+                return dict(cached, size=st.st_size, mtime_ns=st.st_mtime_ns), []
+        else:
+            content_hash = hash_file(path)
+        dimensions = image_dimensions(path)
+        if dimensions is None:
+            return None, self._variant_paths(cached) if cached else []
+        width, height = dimensions
+        entry = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": content_hash,
+            "width": width, "height": height, "variants": [], "processed": True,
+        }
+        if self.variants:
+            entry["variants"] = self._make_variants(path, url, width, height)
+        old = self._variant_paths(cached) if cached else []
+        keep = set(self._variant_paths(entry))
+        return entry, [p for p in old if p not in keep]
+
+    def _variants_current(self, entry):
+        """
+        Whether the entry's variants match what this catalog is configured to
+        produce and are all still present under dest_dir
+        """
+        if bool(entry["variants"]) != (self.variants and any(w < entry["width"] for w in VARIANT_WIDTHS)):
+            return False
+        return all(os.path.exists(path) for path in self._variant_paths(entry))
+
+    def _variant_paths(self, entry):
+        return [os.path.join(self.dest_dir, url.lstrip("/")) for _, _, url in entry.get("variants", [])]
+
+    def _make_variants(self, path, url, width, height):
+        variants = []
+        with Image.open(path) as image:
+            for target in VARIANT_WIDTHS:
+                if target >= width:
+                    break
+                target_height = max(1, round(height * target / width))
+                output_url = variant_url(url, target)
+                output = os.path.join(self.dest_dir, output_url.lstrip("/"))
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+                image.resize((target, target_height), Image.LANCZOS).save(output)
+                variants.append([target, target_height, output_url])
+        return variants
+
+    def stamp(self, url):
+        """Everything the attributes of an <img> of url depend on, or None for an unknown image"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        return json.dumps([entry["width"], entry["height"], entry["variants"]])
+
+    def fingerprint(self):
+        """Hash of the attributes of every image, to tell whether a scan changed any"""
+        digest = hashlib.blake2b(digest_size=16)
+        for url in sorted(self.entries):
+            digest.update(json.dumps([url, self.stamp(url)]).encode())
+        return digest.hexdigest()
+
+    def attributes(self, url, resolve_url=None):
+        """
+        Extra attributes for an <img> of url: lazy loading and async decoding
+        always, plus the intrinsic size and a srcset when the image is known.
+        """
+        props = {}
+        entry = self.entries.get(url)
+        if entry is not None:
+            props["width"] = str(entry["width"])
+            props["height"] = str(entry["height"])
+        props["loading"] = "lazy"
+        props["decoding"] = "async"
+        if entry is not None and entry["variants"]:
+            resolve = resolve_url or (lambda u: u)
+            candidates = [f"{resolve(variant)} {width}w" for width, _, variant in entry["variants"]]
+            candidates.append(f"{resolve(url)} {entry['width']}w")
+            props["srcset"] = ", ".join(candidates)
+            props["sizes"] = f"(max-width: {entry['width']}px) 100vw, {entry['width']}px"
+        return props
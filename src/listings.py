@@ -0,0 +1,208 @@
+import hashlib
+import html
+import json
+import os
+import re
+from htmlnode import LeafNode, ParentNode
+from outputs import AtomicOutput
+from template import load_template
+from urls import make_url_resolver
+
+# Pages under this URL are blog posts; their listings are generated here too
+BLOG_PREFIX = "/blog/"
+POSTS_PER_PAGE = 10
+
+
+class Listing:
+    """
+    A generated page listing other pages. items are (url, label, date)
+    triples, newest first; newer and older link to neighbouring pages of a
+    paginated listing.
+    """
+
+    def __init__(self, url, title, items, newer=None, older=None):
+        self.url = url
+        self.title = title
+        self.items = items
+        self.newer = newer
+        self.older = older
+
+    def fingerprint(self, settings):
+        """Hash of everything the rendered page depends on, given the build settings"""
+        data = [settings, self.url, self.title, self.items, self.newer, self.older]
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+
+def tag_slug(tag):
+    """URL-safe form of a tag: lowercase words joined by hyphens"""
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+
+def tag_slugs(tags):
+    """
+    Map each tag to a slug no other tag uses. When several tags share a slug
+    ("C", "C++"), the one spelled exactly like it keeps it and the others
+    get a suffix derived from their own name, so a tag's URL does not
+    depend on the order its neighbours appeared in.
+    """
+    groups = {}
+    for tag in tags:
+        groups.setdefault(tag_slug(tag), []).append(tag)
+    slugs = {}
+    for slug, group in groups.items():
+        for tag in group:
+            if len(group) == 1 or tag.casefold() == slug:
+                slugs[tag] = slug
+            else:
+                slugs[tag] = f"{slug}-{hashlib.sha256(tag.casefold().encode()).hexdigest()[:6]}"
+    return slugs
+
+
+def _post_item(entry):
+    return (entry["url"], entry["title"], entry["date"])
+
+
+def paginate(url, title, posts, per_page=POSTS_PER_PAGE):
+    """
+    Split posts (newest first) into listing pages. Pages are numbered from
+    the oldest post, and all but the front page at url hold exactly
+    per_page posts, so a new post only changes the front page (and, when
+    the front page overflows, the page split off from it) instead of
+    shifting every page. The front page holds per_page to 2 * per_page - 1 posts.
+    """
+    oldest_first = posts[::-1]
+    count = max(1, len(oldest_first) // per_page)
+
+    def number_url(number):
+        return url if number == count else f"{url}page/{number}/"
+
+    listings = []
+    for number in range(1, count + 1):
+        start = (number - 1) * per_page
+        chunk = oldest_first[start:start + per_page] if number < count else oldest_first[start:]
+        listings.append(Listing(
+            number_url(number),
+            title if number == count else f"{title}, page {number}",
+            [_post_item(entry) for entry in reversed(chunk)],
+            newer=number_url(number + 1) if number < count else None,
+            older=number_url(number - 1) if number > 1 else None,
+        ))
+    return listings
+
+
+def build_listings(index, per_page=POSTS_PER_PAGE):
+    """
+    Plan every listing page from a SiteIndex: the paginated blog index, a
+    paginated page per tag with an index of tags, and an archive page per
+    year with an index of years. Returns a list of Listings.
+    """
+    posts = [entry for entry in index.entries()
+             if entry["url"].startswith(BLOG_PREFIX) and entry["url"] != BLOG_PREFIX]
+    if not posts:
+        return []
+
+    listings = paginate(BLOG_PREFIX, "Blog", posts, per_page)
+
+    # Tags differing only in case are one tag, named as the newest post spells it
+    tagged = {}
+    names = {}
+    for entry in posts:
+        for key, tag in {tag.casefold(): tag for tag in reversed(entry["tags"])}.items():
+            names.setdefault(key, tag)
+            tagged.setdefault(key, []).append(entry)
+    slugs = tag_slugs(names.values())
+    tag_items = []
+    for key in sorted(tagged):
+        tag = names[key]
+        url = f"{BLOG_PREFIX}tags/{slugs[tag]}/"
+        listings.extend(paginate(url, f"Posts tagged {html.escape(tag)}", tagged[key], per_page))
+        tag_items.append((url, f"{tag} ({len(tagged[key])})", None))
+    if tag_items:
+        listings.append(Listing(f"{BLOG_PREFIX}tags/", "Tags", tag_items))
+
+    years = {}
+    for entry in posts:
+        if entry["date"]:
+            years.setdefault(entry["date"][:4], []).append(entry)
+    year_items = []
+    for year in sorted(years, reverse=True):
+        url = f"{BLOG_PREFIX}archive/{year}/"
+        listings.append(Listing(url, f"Archive: {year}", [_post_item(entry) for entry in years[year]]))
+        year_items.append((url, f"{year} ({len(years[year])})", None))
+    if year_items:
+        listings.append(Listing(f"{BLOG_PREFIX}archive/", "Archive", year_items))
+    return listings
+
+
+def listing_node(listing, resolve_url):
+    """Render a Listing's body as an HTMLNode tree"""
+    items = []
+    for url, label, date in listing.items:
+        children = [LeafNode("a", html.escape(label, quote=False), {"href": resolve_url(url)})]
+        if date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", html.escape(date), {"datetime": html.escape(date)}))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", listing.title), ParentNode("ul", items, {"class": "listing"})]
+    links = []
+    if listing.newer:
+        links.append(LeafNode("a", "Newer posts", {"href": resolve_url(listing.newer), "rel": "prev"}))
+    if listing.older:
+        links.append(LeafNode("a", "Older posts", {"href": resolve_url(listing.older), "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links, {"class": "pagination"}))
+    return ParentNode("div", children)
+
+
+def listing_output_path(url, dest_dir):
+    return os.path.join(dest_dir, url.lstrip("/"), "index.html")
+
+
+def generate_listings(index, template_path, dest_dir, basepath="/", manifest=None, per_page=POSTS_PER_PAGE,
+                      listings=None, minifier=None):
+    """
+    Write the listing pages planned from index (or the given listings) into dest_dir. With a
+    manifest, only listings whose fingerprint changed or that the dependency
+    graph shows were built from an older template are re-rendered, and
+    listings that are no longer planned are removed. The fingerprint covers
+    the metadata of the listed pages. Listings whose URL is
+    taken by a content page are left to the content page. With a Minifier,
+    listings are written as minified HTML.
+    Returns (written, unchanged, stale outputs).
+    """
+    settings = {"basepath": basepath, "minify": minifier is not None}
+    template_key = f"template:{template_path}"
+    dirty = set()
+    if manifest is not None:
+        manifest.begin_pass("listings")
+        template_digest = manifest.digest(template_path)
+        dirty = manifest.graph.dirty(lambda key: template_digest if key == template_key else None, {"template"})
+    page_urls = {entry["url"] for entry in index.pages.values()}
+    template = load_template(template_path, basepath, minifier is not None)
+    resolve_url = make_url_resolver(basepath)
+
+    written = unchanged = 0
+    if listings is None:
+        listings = build_listings(index, per_page)
+    for listing in listings:
+        if listing.url in page_urls:
+            print(f"Skipping listing {listing.url}: a content page has that URL")
+            if manifest is not None:
+                # The output now belongs to the page; don't let prune delete it
+                manifest.forget("listings", listing.url)
+            continue
+        output = listing_output_path(listing.url, dest_dir)
+        if manifest is not None:
+            changed = manifest.fingerprint_changed("listings", listing.url, listing.fingerprint(settings), output)
+            if not changed and output in manifest.graph and output not in dirty:
+                unchanged += 1
+                continue
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with AtomicOutput(output) as f:
+            template.render(f, {"Title": listing.title, "Content": listing_node(listing, resolve_url)}, minifier)
+        if manifest is not None:
+            manifest.graph.set_dependencies(output, {template_key: template_digest})
+        written += 1
+
+    stale = manifest.prune("listings") if manifest is not None else []
+    return written, unchanged, stale
@@ -1,124 +1,770 @@
 from textnode import TextNode, TextType
+import argparse
+import collections
+import contextlib
+import glob
+import io
+import itertools
 import os
 import shutil
 import sys
-from block_processing import markdown_to_html_node, extract_title
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from block_processing import Document, iter_blocks, render_block
+from manifest import BuildManifest, MANIFEST_NAME
+from template import TEMPLATES_DIR, load_template, page_template
+from urls import make_url_resolver
+from devserver import DevServer, make_watcher
+from sync import SYNC_MODES, needs_sync, sync_file, sync_tree
+from profiling import BuildProfiler, NULL_PROFILER
+from render_cache import BlockCache, BLOCK_CACHE_NAME
+from frontmatter import split_front_matter
+from site_index import SiteIndex, SITE_INDEX_NAME, page_entry, page_url
+from listings import build_listings, generate_listings, listing_output_path
+from feeds import FEED_NAME, SITEMAP_NAME, is_site_url, make_absolute_url, write_atom_feed, write_sitemaps
+from compress import Precompressor, remove_compressed
+from htmlnode import Minifier
+from images import IMAGE_CACHE_NAME, IMAGE_SUFFIXES, ImageCatalog
+from pipeline import PIPELINE_DEPTH, OutputWriter, prefetch
+from outputs import AtomicOutput, output_stats
 from pathlib import Path
 
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+DEST_DIR = "docs"
+# Build state (manifest, site index, caches), kept out of the published DEST_DIR
+BUILD_DIR = ".build"
 
-def copy_directory_contents(src_dir, dest_dir):
-    """
-    Recursively copy all contents from src_dir to dest_dir.
-    First deletes the destination directory if it exists.
-    """
-    # Remove destination directory if it exists
-    if os.path.exists(dest_dir):
-        print(f"Removing existing directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
-    
-    # Create destination directory
-    print(f"Creating directory: {dest_dir}")
-    os.makedirs(dest_dir)
-    
-    # Copy all files and subdirectories recursively
-    copy_recursive(src_dir, dest_dir)
+# Rendered page bodies up to this size stay in memory before spilling to disk
+SPOOL_MAX_SIZE = 1 << 20
 
-def copy_recursive(src, dest):
+
+def remove_outputs(paths, dest_dir):
     """
-    Recursive helper function to copy files and directories
+    Delete generated files, their precompressed siblings, and any
+    directories left empty under dest_dir.
+    Returns the number of files removed.
     """
-    # Ensure destination directory exists
-    if not os.path.exists(dest):
-        os.makedirs(dest)
-    
-    # Iterate through all items in source directory
-    for item in os.listdir(src):
-        src_path = os.path.join(src, item)
-        dest_path = os.path.join(dest, item)
-        
-        if os.path.isfile(src_path):
-            # Copy file
-            shutil.copy(src_path, dest_path)
-            print(f"Copied file: {src_path} -> {dest_path}")
-        else:
-            # Recursively copy directory
-            print(f"Copying directory: {src_path} -> {dest_path}")
-            copy_recursive(src_path, dest_path)
+    removed = 0
+    root = os.path.abspath(dest_dir)
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed stale file: {path}")
+            removed += 1
+        remove_compressed(path)
+        # Prune now-empty parent directories, never the destination root itself
+        parent = os.path.dirname(os.path.abspath(path))
+        while parent != root and parent.startswith(root + os.sep):
+            if os.path.isdir(parent) and not os.listdir(parent):
+                os.rmdir(parent)
+            parent = os.path.dirname(parent)
+    return removed
+
+class PageGenerationError(Exception):
+    """Raised after a build in which one or more pages failed to render"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__(f"{len(failures)} page(s) failed to generate")
 
-def main():
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help='URL prefix the site is served from (default "/")')
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="render pages in N worker processes (0 = one per CPU)")
+    parser.add_argument("--static-mode", choices=SYNC_MODES, default="copy",
+                        help="how static files reach docs/: copy, hardlink, or reflink (default copy)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash instead of mtime")
+    parser.add_argument("--block-cache", action="store_true",
+                        help="reuse rendered HTML for identical markdown blocks, kept in .build/ between builds")
+    parser.add_argument("--block-cache-size", type=int, default=10000, metavar="N",
+                        help="most blocks the cache keeps (default 10000)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each build stage and report totals and the slowest pages")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to report (default 10)")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="also write a Chrome trace JSON of every stage (implies --profile)")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and .br, if the brotli module is installed) next to compressible outputs")
+    parser.add_argument("--minify", action="store_true",
+                        help="write minified HTML and report the bytes saved")
+    parser.add_argument("--image-variants", action="store_true",
+                        help="write downscaled copies of large images and offer them in srcset (needs Pillow)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="overlap reading sources, rendering and writing pages (helps on slow filesystems)")
+    parser.add_argument("--site-url", default="",
+                        help="scheme and host the site is published at (e.g. https://example.com); "
+                             "sitemap.xml and feed.xml need absolute URLs and are only written with it")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, serve the site with live reload and rebuild on changes")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port for the --watch dev server (default 8888)")
+    args = parser.parse_args(argv)
+    if args.site_url and not is_site_url(args.site_url):
+        parser.error(f"--site-url must be an absolute http(s) URL, got {args.site_url!r}")
+    return args
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
     # Get basepath from CLI args or default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     print(f"Using basepath: {basepath}")
-    
+    if not args.site_url:
+        print("No --site-url given, sitemap.xml and feed.xml will not be written")
+
+    # Build state describes DEST_DIR; without DEST_DIR it is meaningless
+    if not os.path.exists(DEST_DIR) and os.path.exists(BUILD_DIR):
+        print(f"No {DEST_DIR} directory found, removing build state: {BUILD_DIR}")
+        shutil.rmtree(BUILD_DIR)
+
+    # The manifest from the previous build tells us what can be skipped.
+    # Without one (first build, or deleted to force a full rebuild) start clean.
+    manifest = BuildManifest.load(os.path.join(BUILD_DIR, MANIFEST_NAME))
+    if manifest.is_new and os.path.exists(DEST_DIR):
+        print(f"No build manifest found, removing existing directory: {DEST_DIR}")
+        shutil.rmtree(DEST_DIR)
+
+    # Page metadata carried over for pages this build skips
+    index = SiteIndex.load(os.path.join(BUILD_DIR, SITE_INDEX_NAME))
+
+    profiler = None
+    if args.profile or args.profile_trace:
+        profiler = BuildProfiler(trace=bool(args.profile_trace))
+
+    minifier = Minifier() if args.minify else None
+
+    compressor = None
+    if args.precompress:
+        compressor = Precompressor(profiler=profiler)
+
+    images = ImageCatalog(STATIC_DIR, DEST_DIR, os.path.join(BUILD_DIR, IMAGE_CACHE_NAME),
+                          args.image_variants).load()
+    if args.image_variants and not images.variants:
+        print("Pillow is not installed, image variants are disabled")
+    update_images(images)
+
+    cache = None
+    cache_path = os.path.join(BUILD_DIR, BLOCK_CACHE_NAME)
+    if args.block_cache:
+        # Minified and regular HTML for a block must not share an entry
+        context = basepath + ("\0minify" if minifier is not None else "")
+        cache = BlockCache(args.block_cache_size, context=context).load(cache_path)
+
+    try:
+        build_site(basepath, manifest, jobs, args.static_mode, args.checksum, profiler, cache, index,
+                   args.site_url, compressor, minifier, images, args.pipeline)
+    except PageGenerationError as e:
+        # Failed pages were dropped from the manifest, so the next build retries them
+        manifest.save()
+        index.save()
+        images.save()
+        report_failures(e)
+        if not args.watch:
+            sys.exit(f"Build failed: {e}")
+    else:
+        manifest.save()
+        index.save()
+        images.save()
+        print("All pages generated successfully!")
+    finally:
+        if cache is not None:
+            cache.save(cache_path)
+            print(f"Block cache: {cache.stats()}")
+        written, unchanged = output_stats.take()
+        print(f"Output files: {written} written, {unchanged} unchanged")
+        if minifier is not None:
+            print(f"Minified output: {minifier.saved} bytes saved")
+        if compressor is not None:
+            print(f"Precompressed files: {compressor.wait()} written")
+        if profiler is not None:
+            profiler.report(args.profile_top)
+            if args.profile_trace:
+                profiler.write_chrome_trace(args.profile_trace)
+                print(f"Chrome trace written to {args.profile_trace}")
+
+    if args.watch:
+        watch(basepath, manifest, args.port, args.static_mode, cache, index, args.site_url, compressor, minifier,
+              images)
+    if compressor is not None:
+        compressor.close()
+
+def update_images(images):
+    """Re-read changed images and remove variants of images that are gone"""
+    processed, stale = images.scan()
+    removed = remove_outputs(stale, DEST_DIR)
+    print(f"Images: {len(images.entries)} known, {processed} processed, {removed} stale variants removed")
+
+def build_site(basepath, manifest, jobs=1, sync_mode="copy", checksum=False, profiler=None, cache=None, index=None,
+               site_url="", compressor=None, minifier=None, images=None, pipeline=False):
+    """
+    Sync changed static files and generate changed pages into DEST_DIR.
+    With a Precompressor, outputs are compressed as they are written.
+    With a Minifier, pages are written as minified HTML.
+    With an ImageCatalog (already scanned), images get their dimensions.
+    With pipeline, page reads and writes overlap with rendering.
+    """
     # Copy static files to docs directory (for GitHub Pages)
     print("Starting static file copy...")
-    copy_directory_contents("static", "docs")
-    print("Static files copied successfully!")
+    copied, unchanged, stale = sync_tree(STATIC_DIR, DEST_DIR, manifest, sync_mode, checksum, profiler=profiler,
+                                         compressor=compressor)
+    removed = remove_outputs(stale, DEST_DIR)
+    print(f"Static files synced: {copied} copied, {unchanged} unchanged, {removed} removed")
 
     # Generate all pages recursively with basepath
-    generate_pages_recursive("content", "template.html", "docs", basepath)
-    
-    print("All pages generated successfully!")
+    try:
+        generate_pages_recursive(CONTENT_DIR, TEMPLATE_PATH, DEST_DIR, basepath, manifest, jobs, profiler, cache, index,
+                                 compressor, minifier, images, pipeline)
+    finally:
+        # Listings and feeds come from the index, which holds every page that did render
+        if index is not None:
+            update_index_outputs(basepath, manifest, index, site_url, compressor, minifier)
+
+def update_index_outputs(basepath, manifest, index, site_url="", compressor=None, minifier=None):
+    """
+    Regenerate the blog listing pages affected by changes to the site index,
+    then, given the site_url they need, the sitemap and Atom feed; without
+    one, those left by an earlier build are removed.
+    """
+    listings = build_listings(index)
+    written, unchanged, stale = generate_listings(index, TEMPLATE_PATH, DEST_DIR, basepath, manifest,
+                                                  listings=listings, minifier=minifier)
+    removed = remove_outputs(stale, DEST_DIR)
+    print(f"Listing pages: {written} written, {unchanged} unchanged, {removed} removed")
+
+    pages = sorted(index.pages.values(), key=lambda entry: entry["url"])
+    page_urls = {entry["url"] for entry in pages}
+    outputs = [listing_output_path(listing.url, DEST_DIR) for listing in listings if listing.url not in page_urls]
+    if site_url:
+        absolute_url = make_absolute_url(basepath, site_url)
+        urls = itertools.chain(
+            ((entry["url"], entry["date"]) for entry in pages),
+            ((listing.url, None) for listing in listings if listing.url not in page_urls),
+        )
+        count = write_sitemaps(urls, DEST_DIR, absolute_url)
+        outputs.append(os.path.join(DEST_DIR, SITEMAP_NAME))
+        outputs.extend(glob.glob(os.path.join(DEST_DIR, "sitemap-*.xml")))
+        home = next((entry for entry in pages if entry["url"] == "/"), None)
+        title = home["title"] if home and home["title"] else "Feed"
+        feed_path = os.path.join(DEST_DIR, FEED_NAME)
+        feed_entries = write_atom_feed(pages, feed_path, absolute_url, title)
+        if feed_entries:
+            outputs.append(feed_path)
+        else:
+            remove_outputs([feed_path], DEST_DIR)
+        print(f"Sitemap: {count} URLs, feed: {feed_entries} entries")
+    else:
+        # Left by an earlier build that had a site URL; their URLs may be out of date
+        remove_outputs([os.path.join(DEST_DIR, SITEMAP_NAME), os.path.join(DEST_DIR, FEED_NAME)]
+                       + glob.glob(os.path.join(DEST_DIR, "sitemap-*.xml")), DEST_DIR)
+
+    if compressor is not None:
+        for path in outputs:
+            compressor.submit(path)
+
+def report_failures(error):
+    for source, details in error.failures:
+        print(f"Failed to generate {source}:\n{details}", file=sys.stderr)
+
+def watch(basepath, manifest, port, sync_mode="copy", cache=None, index=None, site_url="", compressor=None,
+          minifier=None, images=None):
+    """
+    Serve DEST_DIR with live reload and rebuild whatever the watched
+    sources affect each time they change, until interrupted.
+    """
+    server = DevServer(DEST_DIR, port)
+    server.start()
+    watcher = make_watcher([CONTENT_DIR, STATIC_DIR, TEMPLATE_PATH]
+                           + ([TEMPLATES_DIR] if os.path.isdir(TEMPLATES_DIR) else []))
+    print(f"Serving {DEST_DIR} at http://localhost:{port}/ ({type(watcher).__name__}), press Ctrl+C to stop")
+    try:
+        while True:
+            changed = {os.path.normpath(path) for path in watcher.wait()}
+            started = time.perf_counter()
+            try:
+                rebuild_changed(changed, basepath, manifest, sync_mode, cache, index, site_url, compressor, minifier,
+                                images)
+            except PageGenerationError as e:
+                report_failures(e)
+            except Exception:
+                # Keep watching; the next save will likely fix it
+                traceback.print_exc()
+            if compressor is not None:
+                compressor.wait()
+            manifest.save()
+            if index is not None:
+                index.save()
+            if images is not None:
+                images.save()
+            server.notify_reload()
+            written, unchanged = output_stats.take()
+            print(f"Rebuilt {len(changed)} changed path(s) in {time.perf_counter() - started:.3f}s "
+                  f"({written} files written, {unchanged} unchanged)")
+    except KeyboardInterrupt:
+        print("Stopping watch mode")
+    finally:
+        watcher.close()
+        server.shutdown()
+
+def rebuild_changed(changed, basepath, manifest, sync_mode="copy", cache=None, index=None, site_url="",
+                    compressor=None, minifier=None, images=None):
+    """
+    Re-render only the pages and re-copy only the static files affected by
+    the changed paths. When the template or an image's attributes changed,
+    the pages that used them are found in the dependency graph instead.
+    Listing pages, the sitemap and the feed are refreshed from the updated
+    site index.
+    """
+    shared_changed = TEMPLATE_PATH in changed or any(path.startswith(TEMPLATES_DIR + os.sep) for path in changed)
+    if images is not None and any(path.startswith(STATIC_DIR + os.sep)
+                                  and os.path.splitext(path)[1].lower() in IMAGE_SUFFIXES for path in changed):
+        fingerprint = images.fingerprint()
+        update_images(images)
+        shared_changed = shared_changed or images.fingerprint() != fingerprint
+    failures = []
+    if shared_changed:
+        # Also picks up the changed content pages, and prunes deleted ones
+        try:
+            generate_pages_recursive(CONTENT_DIR, TEMPLATE_PATH, DEST_DIR, basepath, manifest, cache=cache,
+                                     index=index, compressor=compressor, minifier=minifier, images=images)
+        except PageGenerationError as e:
+            failures.extend(e.failures)
+
+    stamp = dependency_stamper(manifest, images)
+    for path in sorted(changed):
+        if path.startswith(CONTENT_DIR + os.sep):
+            if os.path.isfile(path):
+                if not path.endswith(".md") or shared_changed:
+                    continue
+                html_dest = page_output_path(path, CONTENT_DIR, DEST_DIR)
+                if not manifest.changed("pages", path, html_dest):
+                    continue
+                try:
+                    document = generate_page(path, TEMPLATE_PATH, html_dest, basepath, cache=cache,
+                                             compressor=compressor, minifier=minifier, images=images)
+                    dependencies = page_dependencies(path, TEMPLATE_PATH, document)
+                    manifest.graph.set_dependencies(html_dest, {key: stamp(key) for key in dependencies})
+                    if index is not None:
+                        index.update(path, page_url(html_dest, DEST_DIR), page_entry(document))
+                except Exception:
+                    manifest.forget("pages", path)
+                    failures.append((path, traceback.format_exc()))
+            elif not os.path.exists(path):
+                remove_outputs(manifest.remove_sources("pages", path), DEST_DIR)
+                if index is not None:
+                    index.remove_sources(path)
+        elif path.startswith(STATIC_DIR + os.sep):
+            if os.path.isfile(path):
+                dest_path = os.path.join(DEST_DIR, os.path.relpath(path, STATIC_DIR))
+                manifest.track("static", path, dest_path)
+                if needs_sync(path, dest_path):
+                    sync_file(path, dest_path, sync_mode)
+                    print(f"Copied file: {path} -> {dest_path}")
+                    if compressor is not None:
+                        compressor.submit(dest_path)
+            elif not os.path.exists(path):
+                remove_outputs(manifest.remove_sources("static", path), DEST_DIR)
+    if index is not None:
+        update_index_outputs(basepath, manifest, index, site_url, compressor, minifier)
+    if failures:
+        raise PageGenerationError(failures)
+
+def page_dependencies(source, template_path, document):
+    """Dependency graph keys of a rendered page: its source, its template and the images it embeds"""
+    template_key = f"template:{page_template(document.metadata, template_path)}"
+    return [f"source:{source}", template_key] + [f"image:{url}" for url in sorted(document.image_urls)]
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def dependency_stamper(manifest, images=None):
+    """
+    Return stamp(key) for the dependency graph: the content hash of a source
+    or template file, or the attributes an image's <img> tags were given.
+    """
+    def stamp(key):
+        kind, _, name = key.partition(":")
+        if kind == "image":
+            return images.stamp(name) if images is not None else None
+        return manifest.digest(name) if os.path.isfile(name) else None
+    return stamp
+
+def page_output_path(source, content_dir, dest_dir):
+    """Map a markdown source under content_dir to its .html output under dest_dir"""
+    relative_path = Path(source).relative_to(content_dir)
+    return str(Path(dest_dir) / relative_path.with_suffix('.html'))
+
+def generate_page(from_path, template_path, dest_path, basepath="/", profiler=None, cache=None, compressor=None,
+                  minifier=None, images=None):
     """
     Generate an HTML page from markdown using a template with basepath support.
+    Blocks are rendered as they are read; the page is written atomically and
+    only if changed. Returns the page's Document.
     """
+    profiler = profiler or NULL_PROFILER
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    # Read markdown file
-    with open(from_path, 'r') as f:
-        markdown = f.read()
-    
-    # Read template file
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown)
-    content = html_node.to_html()
-    
-    # Extract title
-    title = extract_title(markdown)
-    
-    # Replace placeholders in template
-    html_output = template.replace('{{ Title }}', title).replace('{{ Content }}', content)
-    
-    # Replace absolute paths with basepath
-    html_output = html_output.replace('href="/', f'href="{basepath}')
-    html_output = html_output.replace('src="/', f'src="{basepath}')
-    
-    # Ensure destination directory exists
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    
-    # Write HTML file
-    with open(dest_path, 'w') as f:
-        f.write(html_output)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+    def open_output():
+        # Ensure destination directory exists
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        return AtomicOutput(dest_path)
+
+    with open(from_path, 'r') as source:
+        document = render_page(from_path, source, template_path, open_output, basepath, profiler, cache, minifier,
+                               images)
+    if compressor is not None:
+        compressor.submit(dest_path)
+    profiler.count("pages")
+    return document
+
+def render_page_text(from_path, text, template_path, dest_path, basepath="/", profiler=None, cache=None,
+                     minifier=None, images=None):
+    """
+    Like generate_page for a source already read into text, but returns
+    (document, html) instead of writing the page.
+    """
+    profiler = profiler or NULL_PROFILER
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    buffer = io.StringIO()
+    document = render_page(from_path, io.StringIO(text), template_path, lambda: contextlib.nullcontext(buffer),
+                           basepath, profiler, cache, minifier, images)
+    profiler.count("pages")
+    return document, buffer.getvalue()
+
+def render_page(from_path, source, template_path, open_output, basepath="/", profiler=None, cache=None,
+                minifier=None, images=None):
+    """
+    Render the markdown lines of source into the template (or the one its
+    front matter names), writing the page to the stream open_output()
+    returns. The output is only opened once the body has rendered and has a
+    title. Returns the page's Document.
+    """
+    profiler = profiler or NULL_PROFILER
+
+    with tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE, mode='w+') as body:
+        metadata, lines = split_front_matter(source)
+        document = Document(metadata)
+        # Compiled template, read from disk only once per process
+        with profiler.stage("template_load", from_path):
+            template = load_template(page_template(metadata, template_path), basepath, minifier is not None)
+        # Convert markdown to HTML, resolving link and image URLs against the basepath
+        content = StreamedContent(lines, make_url_resolver(basepath), cache, profiler, from_path, document, images)
+        content.write_html(body, minifier)
+        if document.title is None:
+            raise Exception("No h1 header found in markdown")
+        body.seek(0)
+
+        # Write HTML file, copying the rendered body into the template
+        with profiler.stage("write", from_path):
+            with open_output() as f:
+                with profiler.stage("template", from_path):
+                    template.render(f, {"Title": document.title, "Content": SpooledContent(body)}, minifier)
+    return document
+
+class StreamedContent:
+    """
+    Page body that parses, renders and serializes the source's blocks one at
+    a time while it is written, recording each block in document.
+    """
+
+    def __init__(self, lines, resolve_url, cache, profiler, page, document, images=None):
+        self.lines = lines
+        self.resolve_url = resolve_url
+        self.cache = cache
+        self.profiler = profiler
+        self.page = page
+        self.document = document
+        self.images = images
+
+    def write_html(self, stream, minifier=None):
+        profiler = self.profiler
+        blocks = iter_blocks(self.lines)
+        stream.write("<div>")
+        while True:
+            # Reading and splitting happen lazily, inside next()
+            with profiler.stage("blocks", self.page):
+                block = next(blocks, None)
+            if block is None:
+                break
+            profiler.count("blocks")
+            with profiler.stage("inline", self.page):
+                self.document.add_block(block)
+                node = render_block(block, self.resolve_url, self.cache, minifier, self.images)
+            with profiler.stage("serialize", self.page):
+                node.write_html(stream, minifier)
+        stream.write("</div>")
+
+class SpooledContent:
+    """Already-rendered HTML in a file-like buffer, copied out in chunks"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def write_html(self, stream, minifier=None):
+        # Already serialized (and minified, if at all) when it was rendered
+        shutil.copyfileobj(self.buffer, stream, SPOOL_MAX_SIZE)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1,
+                             profiler=None, cache=None, index=None, compressor=None, minifier=None, images=None,
+                             pipeline=False):
     """
     Recursively generate HTML pages from all markdown files in content directory.
+    With a manifest, only changed pages (or pages whose template or images
+    changed) are rendered and pages of deleted sources are removed.
     """
     content_path = Path(dir_path_content)
     dest_path = Path(dest_dir_path)
     
     # Ensure destination directory exists
     dest_path.mkdir(parents=True, exist_ok=True)
-    
+
+    rebuild_all = True
+    dirty = set()
+    if index is not None:
+        index.begin_pass()
+    if manifest is not None:
+        manifest.begin_pass("pages")
+        settings = {"basepath": basepath, "minify": minifier is not None}
+        rebuild_all = manifest.settings_changed(settings)
+        stamp = dependency_stamper(manifest, images)
+        dirty = manifest.graph.dirty(stamp, {"template", "image"})
+
+    skipped = 0
+    pending = []
     # Iterate through all items recursively
-    for item in content_path.rglob('*'):
+    for item in sorted(content_path.rglob('*')):
         if item.is_file() and item.suffix == '.md':
-            # Calculate relative path from content directory
-            relative_path = item.relative_to(content_path)
             # Change .md to .html and build destination path
-            html_filename = relative_path.with_suffix('.html')
-            html_dest_path = dest_path / html_filename
+            html_dest_path = page_output_path(item, content_path, dest_path)
+
+            if manifest is not None:
+                changed = manifest.changed("pages", str(item), html_dest_path)
+                indexed = index is None or str(item) in index
+                # A page with no recorded dependencies predates the graph
+                tracked = html_dest_path in manifest.graph and html_dest_path not in dirty
+                if not changed and not rebuild_all and indexed and tracked:
+                    if index is not None:
+                        index.keep(str(item))
+                    if compressor is not None:
+                        compressor.submit(html_dest_path)
+                    skipped += 1
+                    continue
             
+            pending.append((str(item), html_dest_path))
+
+    failures = []
+    if pipeline:
+        entries, failures = generate_pages_pipelined(pending, template_path, basepath, jobs, profiler, cache,
+                                                     compressor, minifier, images)
+    elif jobs > 1 and len(pending) > 1:
+        entries, failures = generate_pages_parallel(pending, template_path, basepath, jobs, profiler, cache,
+                                                    compressor, minifier, images)
+    else:
+        entries = []
+        for source, html_dest in pending:
             # Ensure parent directory exists
-            html_dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Generate the page with basepath
-            generate_page(str(item), template_path, str(html_dest_path), basepath)
+            Path(html_dest).parent.mkdir(parents=True, exist_ok=True)
+            try:
+                # Generate the page with basepath
+                document = generate_page(source, template_path, html_dest, basepath, profiler, cache, compressor,
+                                         minifier, images)
+            except Exception:
+                failures.append((source, traceback.format_exc()))
+                continue
+            entries.append((source, html_dest, page_entry(document),
+                            page_dependencies(source, template_path, document)))
+
+    if index is not None:
+        for source, html_dest, entry, _ in entries:
+            index.update(source, page_url(html_dest, dest_dir_path), entry)
+        # Failed pages keep their old entry until they render again
+        for source, _ in failures:
+            index.keep(source)
+        index.prune()
+
+    if manifest is not None:
+        for _, html_dest, _, dependencies in entries:
+            manifest.graph.set_dependencies(html_dest, {key: stamp(key) for key in dependencies})
+        for source, _ in failures:
+            manifest.forget("pages", source)
+        removed = remove_outputs(manifest.prune("pages"), dest_dir_path)
+        print(f"Skipped {skipped} unchanged pages, removed {removed} stale pages")
+    if failures:
+        raise PageGenerationError(failures)
+
+def generate_pages_parallel(pages, template_path, basepath, jobs, profiler=None, cache=None, compressor=None,
+                            minifier=None, images=None):
+    """
+    Render (source, dest) pairs across a pool of worker processes, replaying
+    their logs in page order. Returns (entries, failures) like the sequential
+    loop in generate_pages_recursive.
+    """
+    # Several batches per worker keeps the pool busy when page sizes vary
+    batch_size = max(1, min(64, len(pages) // (jobs * 4)))
+    batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+    print(f"Rendering {len(pages)} pages with {jobs} workers in {len(batches)} batches")
+
+    entries = []
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache, images)) as pool:
+        profile = profiler is not None
+        trace = profile and profiler.trace
+        futures = [pool.submit(_generate_batch, batch, template_path, basepath, profile, trace, minifier is not None)
+                   for batch in batches]
+        for future in futures:
+            for source, html_dest, log, entry, dependencies, _, error in _merge_batch(future.result(), profiler,
+                                                                                     cache, minifier):
+                print(log, end="")
+                if error is not None:
+                    failures.append((source, error))
+                else:
+                    entries.append((source, html_dest, entry, dependencies))
+                    if compressor is not None:
+                        compressor.submit(html_dest)
+    return entries, failures
+
+def generate_pages_pipelined(pages, template_path, basepath, jobs=1, profiler=None, cache=None, compressor=None,
+                             minifier=None, images=None):
+    """
+    Render (source, dest) pairs as a pipeline whose stages overlap: a reader
+    thread prefetches sources, pages are rendered here (or, with jobs > 1,
+    in a process pool), and a writer thread writes each page to a temporary
+    file renamed into place. The queues between the stages are bounded, so
+    only a fixed number of sources and pages are held in memory however
+    many pages there are. Pages are compressed once written. Returns
+    (entries, failures) like generate_pages_parallel.
+    """
+    on_written = compressor.submit if compressor is not None else None
+    writer = OutputWriter(PIPELINE_DEPTH, profiler, on_written)
+    rendered = []
+    failures = []
+    try:
+        sources = prefetch(pages, PIPELINE_DEPTH, profiler)
+        if jobs > 1:
+            results = _render_in_pool(sources, len(pages), template_path, basepath, jobs, profiler, cache, minifier,
+                                      images)
+        else:
+            results = _render_here(sources, template_path, basepath, profiler, cache, minifier, images)
+        for source, html_dest, log, entry, dependencies, html, error in results:
+            print(log, end="")
+            if error is not None:
+                failures.append((source, error))
+            else:
+                writer.write(html_dest, html, source)
+                rendered.append((source, html_dest, entry, dependencies))
+    finally:
+        write_failures = writer.close()
+    failed = {source for source, _ in write_failures}
+    entries = [item for item in rendered if item[0] not in failed]
+    return entries, failures + write_failures
+
+def _render_here(sources, template_path, basepath, profiler, cache, minifier, images):
+    """Render stage of the pipeline in this process; yields results in _generate_batch's shape"""
+    for source, html_dest, text, error in sources:
+        entry = dependencies = html = None
+        if error is None:
+            try:
+                document, html = render_page_text(source, text, template_path, html_dest, basepath, profiler, cache,
+                                                  minifier, images)
+                entry = page_entry(document)
+                dependencies = page_dependencies(source, template_path, document)
+            except Exception:
+                error = traceback.format_exc()
+        yield source, html_dest, "", entry, dependencies, html, error
+
+def _render_in_pool(sources, count, template_path, basepath, jobs, profiler, cache, minifier, images):
+    """
+    Render stage of the pipeline in a process pool. Prefetched sources are
+    sent in batches, and no more than two batches per worker are in flight
+    so the reader is held back while the pool is busy.
+    """
+    batch_size = max(1, min(64, count // (jobs * 4)))
+    profile = profiler is not None
+    trace = profile and profiler.trace
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache, images)) as pool:
+        exhausted = False
+        while not exhausted:
+            batch = []
+            taken = 0
+            for source, html_dest, text, error in itertools.islice(sources, batch_size):
+                taken += 1
+                if error is not None:
+                    yield source, html_dest, "", None, None, None, error
+                else:
+                    batch.append((source, html_dest, text))
+            exhausted = taken < batch_size
+            if batch:
+                pending.append(pool.submit(_generate_batch, batch, template_path, basepath, profile, trace,
+                                           minifier is not None))
+            while pending and (len(pending) >= jobs * 2 or exhausted):
+                yield from _merge_batch(pending.popleft().result(), profiler, cache, minifier)
+
+def _merge_batch(batch_result, profiler, cache, minifier):
+    """
+    Fold a worker's profile, cache entries, minify savings and output counts
+    into the parent's; returns its page results.
+    """
+    results, profile_data, cache_data, minify_saved, output_counts = batch_result
+    output_stats.merge(*output_counts)
+    if profile_data is not None:
+        profiler.merge(profile_data)
+    if cache_data is not None:
+        cache.merge(*cache_data)
+    if minifier is not None:
+        minifier.saved += minify_saved
+    return results
+
+# Per-process block cache and image catalog, copied from the parent's by _init_worker
+_worker_cache = None
+_worker_images = None
+
+def _init_worker(cache, images):
+    global _worker_cache, _worker_images
+    _worker_cache = cache
+    _worker_images = images
+
+def _generate_batch(batch, template_path, basepath, profile=False, trace=False, minify=False):
+    """
+    Worker entry point: render a batch of pages, capturing each page's log
+    and error. Items are (source, dest) pairs, which the worker writes, or
+    (source, dest, text) triples of sources already read, whose HTML is
+    returned instead.
+    """
+    profiler = BuildProfiler(trace) if profile else None
+    minifier = Minifier() if minify else None
+    results = []
+    for item in batch:
+        source, html_dest = item[:2]
+        log = io.StringIO()
+        entry = dependencies = html = error = None
+        with contextlib.redirect_stdout(log):
+            try:
+                if len(item) == 3:
+                    document, html = render_page_text(source, item[2], template_path, html_dest, basepath, profiler,
+                                                      _worker_cache, minifier, _worker_images)
+                else:
+                    Path(html_dest).parent.mkdir(parents=True, exist_ok=True)
+                    document = generate_page(source, template_path, html_dest, basepath, profiler, _worker_cache,
+                                             minifier=minifier, images=_worker_images)
+                entry = page_entry(document)
+                dependencies = page_dependencies(source, template_path, document)
+            except Exception:
+                error = traceback.format_exc()
+        results.append((source, html_dest, log.getvalue(), entry, dependencies, html, error))
+
+    cache_data = None
+    if _worker_cache is not None:
+        # Only report what this batch added, so the parent never double counts
+        cache_data = (_worker_cache.take_new_entries(), _worker_cache.hits, _worker_cache.misses)
+        _worker_cache.hits = _worker_cache.misses = 0
+    return (results, profiler.to_dict() if profiler else None, cache_data, minifier.saved if minifier else 0,
+            output_stats.take())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from depgraph import DependencyGraph
+
+MANIFEST_NAME = "manifest.json"
+# Bumped whenever the saved layout changes, so older manifests are discarded
+MANIFEST_VERSION = 2
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persistent record of what the previous build produced.
+
+    For every source file (markdown page or static asset) the manifest keeps
+    the content hash it had and the output path it was written to, so the
+    next build only re-renders or re-copies sources that actually changed
+    and can delete outputs whose sources have vanished. It also carries the
+    DependencyGraph of everything each generated output was built from.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self.is_new = data is None
+        if data is None:
+            data = {"settings": {}, "files": {}, "pages": {}, "static": {}, "listings": {}, "dependencies": {}}
+        # Build-wide inputs (basepath, minify); a change dirties all pages
+        self.settings = data["settings"]
+        # Stat cache so unchanged files are not re-read just to be hashed
+        self.files = data["files"]
+        self.records = {
+            "pages": data["pages"],
+            "static": data["static"],
+            # Generated pages with no source file, keyed by URL
+            "listings": data["listings"],
+        }
+        self.graph = DependencyGraph(data["dependencies"])
+        self.seen = {kind: set() for kind in self.records}
+        self.hashed = set()
+
+    @classmethod
+    def load(cls, path):
+        """Load the manifest at path, or return an empty one if missing or unreadable"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data)
+
+    def save(self):
+        """Write the manifest, dropping stat cache entries for files not hashed in this build"""
+        self.files = {path: info for path, info in self.files.items() if path in self.hashed}
+        data = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "files": self.files,
+            "pages": self.records["pages"],
+            "static": self.records["static"],
+            "listings": self.records["listings"],
+            "dependencies": self.graph.to_data(),
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def digest(self, path):
+        """
+        Return the content hash of path.
+        The file is only re-hashed when its size or mtime differ from the last build.
+        """
+        st = os.stat(path)
+        self.hashed.add(path)
+        cached = self.files.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["hash"]
+        file_hash = hash_file(path)
+        self.files[path] = {"hash": file_hash, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return file_hash
+
+    def settings_changed(self, settings):
+        """
+        Record the build-wide settings and report whether they differ from the previous build.
+        """
+        changed = any(self.settings.get(key) != value for key, value in settings.items())
+        self.settings.update(settings)
+        return changed
+
+    def begin_pass(self, kind):
+        """
+        Start a pass over every source of kind. In watch mode one manifest
+        outlives many passes, and prune(kind) must only keep the sources
+        marked since the latest one.
+        """
+        self.seen[kind] = set()
+
+    def changed(self, kind, source, output):
+        """
+        Mark source as part of this build and report whether output must be regenerated.
+        """
+        return self.fingerprint_changed(kind, source, self.digest(source), output)
+
+    def fingerprint_changed(self, kind, key, fingerprint, output):
+        """
+        Like changed, for outputs generated from data rather than a single
+        source file: the caller supplies a hash of everything output depends on.
+        """
+        self.seen[kind].add(key)
+        previous = self.records[kind].get(key)
+        self.records[kind][key] = {"hash": fingerprint, "output": output}
+        if previous is None or "hash" not in previous:
+            return True
+        if previous["hash"] != fingerprint or previous["output"] != output:
+            return True
+        return not os.path.exists(output)
+
+    def track(self, kind, source, output):
+        """
+        Mark source as part of this build without hashing it, for outputs
+        whose freshness is decided elsewhere (e.g. static files compared by stat).
+        """
+        self.seen[kind].add(source)
+        self.records[kind][source] = {"output": output}
+
+    def forget(self, kind, source):
+        """Drop the record for source so the next build regenerates it"""
+        self.records[kind].pop(source, None)
+
+    def remove_sources(self, kind, path):
+        """
+        Drop the records for path, or for everything under it if it was a directory.
+        Returns the outputs those sources had produced.
+        """
+        prefix = path + os.sep
+        removed = [source for source in self.records[kind] if source == path or source.startswith(prefix)]
+        outputs = [self.records[kind].pop(source)["output"] for source in removed]
+        for output in outputs:
+            self.graph.remove(output)
+        return outputs
+
+    def prune(self, kind):
+        """
+        Remove records for sources not seen in this build.
+        Returns the outputs those sources had produced.
+        """
+        stale = [source for source in self.records[kind] if source not in self.seen[kind]]
+        outputs = []
+        for source in stale:
+            outputs.append(self.records[kind].pop(source)["output"])
+            self.graph.remove(outputs[-1])
+        return outputs
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import threading
+from compress import remove_compressed
+from manifest import hash_file
+
+
+class OutputStats:
+    """Counts of outputs written, and of outputs left untouched because their content was unchanged"""
+
+    def __init__(self):
+        self.written = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def record(self, changed):
+        with self._lock:
+            if changed:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def take(self):
+        """Return and reset (written, unchanged), for reporting them to another process"""
+        with self._lock:
+            counts = (self.written, self.unchanged)
+            self.written = self.unchanged = 0
+        return counts
+
+    def merge(self, written, unchanged):
+        with self._lock:
+            self.written += written
+            self.unchanged += unchanged
+
+
+# Outputs written by this process
+output_stats = OutputStats()
+
+
+class AtomicOutput:
+    """
+    A text output written to a temporary file next to path and hashed on the
+    way. When closed, the temporary file replaces path, unless path already
+    holds exactly the same bytes: then it is discarded and path keeps its
+    mtime, so rsync and HTTP caches see it as unchanged. Either way a reader
+    never sees a partial file. Replacing path deletes its precompressed
+    siblings, which no longer match it. path may be reassigned before
+    closing. Used as a context manager, an exception discards the output.
+    """
+
+    def __init__(self, path, stats=None):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.stats = stats or output_stats
+        self.file = open(self.tmp_path, 'wb')
+        self.digest = hashlib.sha256()
+        # Bytes written so far
+        self.size = 0
+        self.changed = None
+
+    def write(self, text):
+        data = text.encode()
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def close(self):
+        """Move the output into place if it differs from path; returns whether it did"""
+        self.file.close()
+        try:
+            same = os.path.getsize(self.path) == self.size and hash_file(self.path) == self.digest.hexdigest()
+        except OSError:
+            same = False
+        if same:
+            os.remove(self.tmp_path)
+        else:
+            os.replace(self.tmp_path, self.path)
+            remove_compressed(self.path)
+        self.changed = not same
+        self.stats.record(self.changed)
+        return self.changed
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_if_changed(path, text, stats=None):
+    """Write text to path through an AtomicOutput; returns whether path changed"""
+    with AtomicOutput(path, stats) as output:
+        output.write(text)
+    return output.changed
@@ -0,0 +1,112 @@
+import os
+import queue
+import threading
+import traceback
+from outputs import write_if_changed
+from profiling import NULL_PROFILER
+
+# Sources read ahead of, and outputs queued behind, the render stage
+PIPELINE_DEPTH = 16
+
+_DONE = object()
+
+
+def prefetch(pages, depth=PIPELINE_DEPTH, profiler=None):
+    """
+    Read the sources of (source, dest) pairs in a background thread, at most
+    depth ahead of the consumer, so disk reads overlap with rendering.
+    Yields (source, dest, text, error) in order; error is the traceback of
+    a source that could not be read.
+    """
+    profiler = profiler or NULL_PROFILER
+    items = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up once the consumer has gone away rather than block forever
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read():
+        for source, dest in pages:
+            if stop.is_set():
+                return
+            try:
+                with profiler.stage("read", source):
+                    with open(source, 'r') as f:
+                        text = f.read()
+                put((source, dest, text, None))
+            except Exception:
+                put((source, dest, None, traceback.format_exc()))
+        put(_DONE)
+
+    thread = threading.Thread(target=read, name="page-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class OutputWriter:
+    """
+    Writes rendered outputs in a background thread so disk writes overlap
+    with rendering. Outputs go through write_if_changed, so no reader sees
+    a partial file and unchanged outputs are left alone. write() blocks
+    while depth outputs are waiting, which bounds the memory held by the
+    queue. Outputs queued together are written as a batch, creating each
+    directory only once.
+    """
+
+    def __init__(self, depth=PIPELINE_DEPTH, profiler=None, on_written=None):
+        self.items = queue.Queue(depth)
+        self.profiler = profiler or NULL_PROFILER
+        # Called with each path once it is written, e.g. Precompressor.submit
+        self.on_written = on_written
+        self.failures = []
+        self.thread = threading.Thread(target=self._run, name="page-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, path, text, key=None):
+        """Queue text to be written to path; failures are reported against key (default path)"""
+        self.items.put((path, text, key if key is not None else path))
+
+    def _run(self):
+        directories = set()
+        while True:
+            batch = [self.items.get()]
+            while True:
+                try:
+                    batch.append(self.items.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    return
+                path, text, key = item
+                try:
+                    with self.profiler.stage("write", key):
+                        directory = os.path.dirname(path)
+                        if directory not in directories:
+                            os.makedirs(directory or ".", exist_ok=True)
+                            directories.add(directory)
+                        write_if_changed(path, text)
+                    if self.on_written is not None:
+                        self.on_written(path)
+                except Exception:
+                    self.failures.append((key, traceback.format_exc()))
+
+    def close(self):
+        """Wait for every queued output; returns the (key, traceback) pairs of failed writes"""
+        self.items.put(None)
+        self.thread.join()
+        return self.failures
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class BuildProfiler:
+    """
+    Cumulative per-stage timers and counters for a build.
+
+    Stages may nest; each stage is charged only its exclusive time (time
+    spent in nested stages is charged to those), so stage totals add up to
+    the time actually measured. Time is also accumulated per page so the
+    slowest pages can be reported, and every stage can optionally be kept
+    as an event for a Chrome trace (chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.pages = defaultdict(float)
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, page=None):
+        stack = self._local.__dict__.setdefault("stack", [])
+        # [time spent in nested stages] for the stage being timed
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            exclusive = elapsed - frame[0]
+            with self._lock:
+                self.totals[name] += exclusive
+                self.calls[name] += 1
+                if page is not None:
+                    self.pages[page] += exclusive
+                if self.trace:
+                    event = {"name": name, "ph": "X", "ts": start * 1e6, "dur": elapsed * 1e6,
+                             "pid": os.getpid(), "tid": threading.get_ident()}
+                    if page is not None:
+                        event["args"] = {"page": page}
+                    self.events.append(event)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def to_dict(self):
+        return {
+            "totals": dict(self.totals),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+            "pages": dict(self.pages),
+            "events": self.events,
+        }
+
+    def merge(self, data):
+        """Fold in the results of a profiler from another process (see to_dict)"""
+        for name, seconds in data["totals"].items():
+            self.totals[name] += seconds
+        for name, calls in data["calls"].items():
+            self.calls[name] += calls
+        for name, amount in data["counters"].items():
+            self.counters[name] += amount
+        for page, seconds in data["pages"].items():
+            self.pages[page] += seconds
+        if self.trace:
+            self.events.extend(data["events"])
+
+    def report(self, top=10, file=None):
+        total = sum(self.totals.values())
+        print("Build profile (exclusive time per stage):", file=file)
+        for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1]):
+            share = seconds / total if total else 0
+            print(f"  {name:16} {seconds * 1000:10.2f} ms {share:6.1%} {self.calls[name]:8} calls", file=file)
+        if self.counters:
+            print("Counters:", file=file)
+            for name, amount in sorted(self.counters.items()):
+                print(f"  {name:16} {amount:12}", file=file)
+        if self.pages:
+            print(f"Slowest {min(top, len(self.pages))} pages:", file=file)
+            slowest = sorted(self.pages.items(), key=lambda item: -item[1])[:top]
+            for page, seconds in slowest:
+                print(f"  {seconds * 1000:10.2f} ms  {page}", file=file)
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off, so instrumented code costs nothing extra"""
+
+    trace = False
+
+    def stage(self, name, page=None):
+        return nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+BLOCK_CACHE_NAME = "block-cache.json"
+BLOCK_CACHE_VERSION = 2
+
+
+class BlockCache:
+    """
+    LRU-bounded cache of rendered HTML for markdown blocks.
+
+    Entries are addressed by a hash of the block text together with a
+    context string naming everything else rendering depends on (such as
+    the basepath), so a hit can skip block-type detection and inline
+    parsing entirely. Each entry also keeps the bytes minifying the block
+    saved, so hits count toward the minified total. The cache can be saved
+    to and loaded from disk to carry entries between builds.
+    """
+
+    def __init__(self, maxsize=10000, context=""):
+        self.maxsize = maxsize
+        self.context = context.encode()
+        self.entries = OrderedDict()
+        # Entries created since the cache was loaded, for merging worker caches
+        self.new_entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, block):
+        digest = hashlib.blake2b(self.context, digest_size=16)
+        digest.update(b"\0")
+        digest.update(block.encode())
+        return digest.digest()
+
+    def get(self, block):
+        """Return the cached (html, saved) entry for block, or None on a miss"""
+        key = self.key(block)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, block, html, saved=0):
+        key = self.key(block)
+        self.new_entries[key] = (html, saved)
+        self._store(key, (html, saved))
+
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def take_new_entries(self):
+        """Return and clear the entries added since the last call"""
+        entries, self.new_entries = self.new_entries, {}
+        return entries
+
+    def merge(self, entries, hits=0, misses=0):
+        """Fold in entries and counts gathered by another process's cache"""
+        for key, entry in entries.items():
+            self._store(key, entry)
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), {len(self.entries)} entries"
+
+    def load(self, path):
+        """Add the entries saved at path; a missing or unreadable file is ignored"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") != BLOCK_CACHE_VERSION:
+            return self
+        for key, html, saved in data["entries"]:
+            self._store(bytes.fromhex(key), (html, saved))
+        self.new_entries = {}
+        return self
+
+    def save(self, path):
+        data = {
+            "version": BLOCK_CACHE_VERSION,
+            # Oldest first, so loading replays the LRU order
+            "entries": [[key.hex(), html, saved] for key, (html, saved) in self.entries.items()],
+        }
+        tmp_path = path + ".tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
@@ -0,0 +1,121 @@
+import json
+import os
+from pathlib import Path
+
+SITE_INDEX_NAME = "site-index.json"
+SITE_INDEX_VERSION = 1
+
+
+def page_url(output_path, dest_dir):
+    """
+    Return the site-relative URL of an output file under dest_dir, with
+    index.html pages addressed by their directory ("/blog/tom/").
+    """
+    relative = Path(output_path).relative_to(dest_dir).as_posix()
+    if relative == "index.html":
+        return "/"
+    if relative.endswith("/index.html"):
+        return "/" + relative[:-len("index.html")]
+    return "/" + relative
+
+
+def normalize_tags(tags):
+    """Accept tags as a list or a comma-separated string; return a list of strings"""
+    if tags is None:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+
+def page_entry(document):
+    """The index entry for a rendered Document (everything but its URL)"""
+    date = document.metadata.get("date")
+    return {
+        "title": document.title,
+        "date": str(date) if date is not None else None,
+        "tags": normalize_tags(document.metadata.get("tags")),
+        "word_count": document.word_count,
+    }
+
+
+class SiteIndex:
+    """
+    Persistent index of every page's metadata (title, date, tags, URL and
+    word count), keyed by source path.
+
+    Entries are refreshed as pages are rendered and carried over for pages
+    an incremental build skips, so listings and feeds can be generated from
+    the index alone without re-reading any sources.
+    """
+
+    def __init__(self, path=None, pages=None):
+        self.path = path
+        self.pages = pages or {}
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path):
+        """Load the index at path, or return an empty one if missing or unreadable"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != SITE_INDEX_VERSION:
+            return cls(path)
+        return cls(path, data["pages"])
+
+    def save(self):
+        data = {"version": SITE_INDEX_VERSION, "pages": self.pages}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, source):
+        return source in self.pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def begin_pass(self):
+        """Start a pass over every page; prune then drops the entries not marked since"""
+        self.seen = set()
+
+    def keep(self, source):
+        """Mark source as part of this build so prune leaves its entry alone"""
+        self.seen.add(source)
+
+    def update(self, source, url, entry):
+        self.seen.add(source)
+        self.pages[source] = dict(entry, url=url)
+
+    def remove_sources(self, path):
+        """Drop the entries for path, or for everything under it if it was a directory"""
+        prefix = path + os.sep
+        for source in [s for s in self.pages if s == path or s.startswith(prefix)]:
+            del self.pages[source]
+
+    def prune(self):
+        """Drop entries for sources not seen in this build; returns how many"""
+        stale = [source for source in self.pages if source not in self.seen]
+        for source in stale:
+            del self.pages[source]
+        return len(stale)
+
+    def entries(self):
+        """All entries, newest first (undated pages last), then by URL"""
+        dated = sorted((e for e in self.pages.values() if e["date"]), key=lambda e: e["url"])
+        dated.sort(key=lambda e: e["date"], reverse=True)
+        undated = sorted((e for e in self.pages.values() if not e["date"]), key=lambda e: e["url"])
+        return dated + undated
+
+    def tags(self):
+        """Map each tag to its entries, newest first"""
+        tagged = {}
+        for entry in self.entries():
+            for tag in entry["tags"]:
+                tagged.setdefault(tag, []).append(entry)
+        return tagged
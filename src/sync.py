@@ -0,0 +1,136 @@
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from compress import remove_compressed
+from manifest import hash_file
+from profiling import NULL_PROFILER
+
+SYNC_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl request number for FICLONE (share extents on btrfs/xfs/...)
+FICLONE = 0x40049409
+
+# Below this many files the thread pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+
+def needs_sync(src_path, dest_path, checksum=False):
+    """
+    Decide whether dest_path is out of date with src_path. Sizes and mtimes
+    are compared (copies keep the source mtime); with checksum, files of
+    equal size are compared by content hash instead of mtime.
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if checksum:
+        return hash_file(src_path) != hash_file(dest_path)
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+
+def _reflink(src_path, tmp_path):
+    """Clone src into tmp with FICLONE, falling back to an in-kernel copy_file_range"""
+    import fcntl
+    with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dest:
+        try:
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dest.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def sync_file(src_path, dest_path, mode="copy"):
+    """
+    Bring dest_path up to date with src_path using the given mode. The new
+    file is staged next to the destination and renamed into place, so
+    readers never see a partial file. Hardlinks and reflinks fall back to a
+    plain copy when the filesystem cannot provide them. Precompressed
+    siblings of the old dest_path are deleted.
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.sync-tmp"
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(src_path, tmp_path)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+                shutil.copy2(src_path, tmp_path)
+        elif mode == "reflink":
+            try:
+                _reflink(src_path, tmp_path)
+                shutil.copystat(src_path, tmp_path)
+            except (OSError, AttributeError):
+                shutil.copy2(src_path, tmp_path)
+        else:
+            shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        remove_compressed(dest_path)
+    finally:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+
+def sync_tree(src_dir, dest_dir, manifest, mode="copy", checksum=False, workers=8, profiler=None,
+              compressor=None):
+    """
+    Mirror the files under src_dir into dest_dir, skipping files that are
+    already up to date. Files this sync placed in dest_dir on earlier builds
+    whose source is gone are returned so the caller can remove them
+    (dest_dir also holds generated pages, so only tracked files are touched).
+    With a Precompressor, every synced file is handed to it (siblings of
+    unchanged files are left alone by the compressor).
+    Returns (copied, unchanged, stale_outputs).
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"unknown sync mode: {mode}")
+    profiler = profiler or NULL_PROFILER
+    manifest.begin_pass("static")
+
+    pending = []
+    unchanged = []
+    with profiler.stage("static_scan"):
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for name in sorted(files):
+                src_path = os.path.join(root, name)
+                dest_path = os.path.join(dest_dir, os.path.relpath(src_path, src_dir))
+                manifest.track("static", src_path, dest_path)
+                if needs_sync(src_path, dest_path, checksum):
+                    pending.append((src_path, dest_path))
+                else:
+                    unchanged.append(dest_path)
+
+    def copy(src_path, dest_path):
+        with profiler.stage("static_copy"):
+            sync_file(src_path, dest_path, mode)
+        profiler.count("static_bytes", os.path.getsize(dest_path))
+        if compressor is not None:
+            compressor.submit(dest_path)
+
+    if len(pending) >= PARALLEL_THRESHOLD and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(copy, src, dest) for src, dest in pending]
+            for future in futures:
+                future.result()
+    else:
+        for src_path, dest_path in pending:
+            copy(src_path, dest_path)
+    profiler.count("static_files", len(pending))
+    if compressor is not None:
+        for dest_path in unchanged:
+            compressor.submit(dest_path)
+
+    return len(pending), len(unchanged), manifest.prune("static")
@@ -0,0 +1,142 @@
+import io
+import os
+import re
+
+from urls import make_url_resolver
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ *(\w+) *\}\}")
+# Named templates live in this directory next to the default template
+TEMPLATES_DIR = "templates"
+TEMPLATE_NAME_PATTERN = re.compile(r"[\w-]+")
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+# Regions whose whitespace is significant, copied as-is when minifying
+PRESERVED_REGION_PATTERN = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.S)
+# Elements that are not rendered inline, so whitespace beside their tags never shows
+BLOCK_TAGS = (
+    "html|head|body|title|meta|link|base|script|style|noscript|address|article|aside|blockquote|details|"
+    "dialog|summary|div|dl|dt|dd|fieldset|figure|figcaption|footer|form|h[1-6]|header|hgroup|hr|li|main|nav|"
+    "ol|ul|p|pre|section|table|caption|colgroup|col|thead|tbody|tfoot|tr|th|td"
+)
+# Whitespace spanning a line break next to a block-level tag is only layout;
+# between inline elements it separates words, so it is collapsed instead
+LAYOUT_WHITESPACE_PATTERN = re.compile(
+    rf"(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*\n\s*(?=<)|(?<=>)\s*\n\s*(?=</?(?:{BLOCK_TAGS})\b)", re.I
+)
+# ASCII only: a non-breaking space is content, not layout
+WHITESPACE_PATTERN = re.compile(r"\s+", re.ASCII)
+VOID_SELF_CLOSING_PATTERN = re.compile(
+    r"(<(?:area|base|br|col|embed|hr|img|input|link|meta|source|track|wbr)\b[^>]*?)\s*/>", re.I
+)
+
+# Compiled templates keyed on (path, basepath); each entry remembers the
+# file's size and mtime so edits to the template are picked up
+_template_cache = {}
+
+
+def minify_template_source(source):
+    """
+    Minify template markup: drop comments (other than conditional ones),
+    remove line breaks and indentation beside block-level tags, collapse
+    other whitespace runs to one space and drop the slash of self-closing void
+    tags. <pre>, <textarea>, <script> and <style> regions are kept as-is.
+    """
+    # Stand preserved regions in for tags while the rest is minified
+    preserved = []
+
+    def hold(match):
+        preserved.append(match.group(0))
+        return f"<\0{len(preserved) - 1}>"
+
+    text = PRESERVED_REGION_PATTERN.sub(hold, source)
+    text = COMMENT_PATTERN.sub("", text)
+    text = VOID_SELF_CLOSING_PATTERN.sub(r"\1>", text)
+    text = LAYOUT_WHITESPACE_PATTERN.sub(r"\1", text)
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
+    return re.sub(r"<\0(\d+)>", lambda m: preserved[int(m.group(1))], text)
+
+
+class Template:
+    """
+    A page template compiled once into alternating literal text and
+    placeholder names, so rendering is a sequence of writes rather than
+    repeated str.replace passes over the whole document.
+    With minify, the template's own markup is minified once, at compile time.
+    """
+
+    def __init__(self, source, resolve_url=None, minify=False):
+        # URLs in the template itself are resolved once, here, instead of on
+        # every rendered page
+        if resolve_url is not None:
+            source = URL_ATTRIBUTE_PATTERN.sub(
+                lambda m: f'{m.group(1)}="{resolve_url(m.group(2))}"', source
+            )
+        # Bytes minification removes from every rendered page
+        self.minify_saved = 0
+        if minify:
+            minified = minify_template_source(source)
+            self.minify_saved = len(source.encode()) - len(minified.encode())
+            source = minified
+        self.parts = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.parts.append((source[position:match.start()], match.group(1), match.group(0)))
+            position = match.end()
+        self.tail = source[position:]
+
+    def render(self, stream, values, minifier=None):
+        """
+        Write the template to stream, substituting values by placeholder name.
+        A value is either a string or a node with write_html, which is streamed
+        (minified with minifier, if given).
+        Placeholders without a value are left in the output untouched.
+        """
+        write = stream.write
+        for literal, name, placeholder in self.parts:
+            write(literal)
+            value = values.get(name)
+            if value is None:
+                write(placeholder)
+            elif isinstance(value, str):
+                write(value)
+            else:
+                value.write_html(stream, minifier)
+        write(self.tail)
+        if minifier is not None:
+            minifier.saved += self.minify_saved
+
+    def render_to_string(self, values):
+        buffer = io.StringIO()
+        self.render(buffer, values)
+        return buffer.getvalue()
+
+
+def page_template(metadata, default_path):
+    """
+    Path of the template a page asked for with a `template: name` front
+    matter key: name.html in the templates directory next to default_path,
+    or default_path itself when the page names none.
+    Raises ValueError if name is not a plain file name.
+    """
+    name = metadata.get("template")
+    if name is None:
+        return default_path
+    if not isinstance(name, str) or not TEMPLATE_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid template name in front matter: {name!r}")
+    return os.path.join(os.path.dirname(default_path), TEMPLATES_DIR, f"{name}.html")
+
+
+def load_template(path, basepath="/", minify=False):
+    """
+    Return the compiled template at path, reading and compiling it only
+    when it is first used or has changed on disk.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), basepath, minify)
+    cached = _template_cache.get(key)
+    if cached and cached[0] == (st.st_size, st.st_mtime_ns):
+        return cached[1]
+    with open(path, 'r') as f:
+        template = Template(f.read(), make_url_resolver(basepath), minify)
+    _template_cache[key] = ((st.st_size, st.st_mtime_ns), template)
+    return template
@@ -0,0 +1,36 @@
+import random
+import unittest
+from bench import CORPORA, compare, run
+from block_processing import markdown_to_html_node
+
+
+class TestBench(unittest.TestCase):
+    def test_corpora_render(self):
+        rng = random.Random(0)
+        for name, (generator, _) in CORPORA.items():
+            markdown = generator(rng, 2000)
+            self.assertGreaterEqual(len(markdown), 2000, name)
+            self.assertTrue(markdown_to_html_node(markdown).to_html().startswith("<div>"), name)
+
+    def test_run_reports_every_stage(self):
+        results = run(scale=0.005, repeat=1, pages=200, corpora=["links"])
+        stages = results["corpora"]["links"]["stages"]
+        self.assertEqual(
+            set(stages),
+            {"markdown_to_blocks", "block_to_block_type", "classify_block", "text_to_textnodes",
+             "markdown_to_html_node", "to_html"},
+        )
+        self.assertIn("us_per_block", stages["classify_block"])
+        self.assertEqual(results["site"]["pages"], 1)
+        self.assertGreater(results["corpora"]["links"]["peak_memory"], 0)
+
+    def test_compare_flags_regressions_over_threshold(self):
+        baseline = {"corpora": {"links": {"stages": {"to_html": {"seconds": 1.0}, "markdown_to_blocks": {"seconds": 1.0}}}},
+                    "site": {"seconds": 2.0}}
+        results = {"corpora": {"links": {"stages": {"to_html": {"seconds": 1.5}, "markdown_to_blocks": {"seconds": 1.05}}}},
+                   "site": {"seconds": 1.0}}
+        self.assertEqual(compare(results, baseline, 0.1), [("links/to_html", 1.0, 1.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import io
+import os
+import random
+import tempfile
 import unittest
 from block_processing import *
+from urls import make_url_resolver
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -120,6 +125,44 @@ Another paragraph here.
             ]
         )
 
+class TestIterBlocks(unittest.TestCase):
+    def test_matches_markdown_to_blocks_on_lines(self):
+        md = "# Heading\r\n\r\nParagraph one\nstill one\n\n\n\n  - list\n- items  \n \n\nlast"
+        self.assertEqual(
+            list(iter_blocks(io.StringIO(md, newline=""))),
+            markdown_to_blocks(md),
+        )
+
+    def test_fuzz_matches_markdown_to_blocks(self):
+        rng = random.Random(42)
+        pieces = ["a", "b c", " ", "\n", "\n\n", "\r", "\r\n", "\t", "# h", "- x"]
+        for _ in range(2000):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            expected = markdown_to_blocks(md)
+            # Arbitrary chunk boundaries, including inside "\r\n"
+            cuts = sorted(rng.sample(range(len(md) + 1), min(3, len(md) + 1)))
+            chunks = [md[i:j] for i, j in zip([0] + cuts, cuts + [len(md)])]
+            self.assertEqual(list(iter_blocks(chunks)), expected, repr(md))
+
+    def test_reads_file_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, 'w') as f:
+                f.write("first\n\nsecond\n\nthird\n")
+            with open(path, 'r') as f:
+                blocks = iter_blocks(f)
+                self.assertEqual(next(blocks), "first")
+                self.assertEqual(list(blocks), ["second", "third"])
+
+    def test_extract_title_from_lines_stops_at_first_h1(self):
+        def lines():
+            yield "intro\n"
+            yield "# Title\n"
+            raise AssertionError("read past the title")
+
+        self.assertEqual(extract_title_from_lines(lines()), "Title")
+
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
         self.assertEqual(block_to_block_type("# Heading 1"), BlockType.HEADING)
@@ -185,9 +228,9 @@ class TestBlockToBlockType(unittest.TestCase):
         wrong_ol = "1. First\n3. Third"  # Missing 2.
         self.assertEqual(block_to_block_type(wrong_ol), BlockType.PARAGRAPH)
         
-        # Ordered list starting from wrong number
-        wrong_start_ol = "2. First\n3. Second"
-        self.assertEqual(block_to_block_type(wrong_start_ol), BlockType.PARAGRAPH)
+        # Ordered lists may start at any number
+        start_ol = "2. First\n3. Second"
+        self.assertEqual(block_to_block_type(start_ol), BlockType.ORDERED_LIST)
 
     def test_complex_blocks(self):
         # Paragraph with markdown inside
@@ -213,6 +256,34 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
         self.assertEqual(block_to_block_type("   "), BlockType.PARAGRAPH)
 
+class TestClassifyBlock(unittest.TestCase):
+    def test_parsed_parts(self):
+        self.assertEqual(classify_block("### Three"), (BlockType.HEADING, 3))
+        self.assertEqual(classify_block("```\nx = 1\n```"), (BlockType.CODE, ["```", "x = 1", "```"]))
+        self.assertEqual(classify_block("> a\n>b"), (BlockType.QUOTE, ["> a", ">b"]))
+        block_type, parsed = classify_block("- a\n-  b")
+        self.assertEqual(block_type, BlockType.UNORDERED_LIST)
+        self.assertEqual([item.parts for item in parsed.items], [[["a"]], [[" b"]]])
+        block_type, parsed = classify_block("1. a\n2. b. c")
+        self.assertEqual(block_type, BlockType.ORDERED_LIST)
+        self.assertEqual((parsed.start, [item.parts for item in parsed.items]), (1, [[["a"]], [["b. c"]]]))
+        self.assertEqual(classify_block("plain\ntext"), (BlockType.PARAGRAPH, None))
+
+    def test_indented_code_fence(self):
+        self.assertEqual(classify_block("  ```\ncode\n  ```")[0], BlockType.CODE)
+        self.assertEqual(classify_block("  - not a list")[0], BlockType.PARAGRAPH)
+
+    def test_ordered_list_numbers_count_up_from_start(self):
+        self.assertEqual(classify_block("10. a\n11. b")[1].start, 10)
+        self.assertEqual(classify_block("1. a\n3. b")[0], BlockType.PARAGRAPH)
+        self.assertEqual(classify_block("1. a\n2.b")[0], BlockType.PARAGRAPH)
+        self.assertEqual(classify_block("1234567890. a")[0], BlockType.PARAGRAPH)
+
+    def test_quote_and_list_need_every_line(self):
+        self.assertEqual(classify_block("> a\n\n> b")[0], BlockType.PARAGRAPH)
+        self.assertEqual(classify_block("- a\n-b")[0], BlockType.PARAGRAPH)
+
+
 class TestMarkdownToHTMLNode(unittest.TestCase):
     def test_paragraphs(self):
         md = """
@@ -295,6 +366,45 @@ This is another paragraph with _italic_ text and `code` here
             "<div><ol><li>First item with <b>bold</b></li><li>Second item with <i>italic</i></li><li>Third item with <code>code</code></li></ol></div>",
         )
 
+    def test_nested_lists(self):
+        md = "- a\n  - b\n    1. c\n    2. d\n- e"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a<ul><li>b<ol><li>c</li><li>d</li></ol></li></ul></li><li>e</li></ul></div>",
+        )
+
+    def test_dedented_item_joins_nested_list(self):
+        # "c" is left of "b" but still within "a", so it is b's sibling
+        self.assertEqual(
+            markdown_to_html_node("- a\n    - b\n  - c\n- d").to_html(),
+            "<div><ul><li>a<ul><li>b</li><li>c</li></ul></li><li>d</li></ul></div>",
+        )
+        self.assertEqual(
+            markdown_to_html_node("- a\n  - b\n - c").to_html(),
+            "<div><ul><li>a<ul><li>b</li></ul></li><li>c</li></ul></div>",
+        )
+
+    def test_ordered_list_start(self):
+        self.assertEqual(
+            markdown_to_html_node("3. x\n4. y").to_html(),
+            '<div><ol start="3"><li>x</li><li>y</li></ol></div>',
+        )
+
+    def test_multi_paragraph_item(self):
+        md = "- one\n\n  more text\n- two\n\nAfter"
+        self.assertEqual(markdown_to_blocks(md), ["- one\n\n  more text\n- two", "After"])
+        self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md))
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li><p>one</p><p>more text</p></li><li>two</li></ul><p>After</p></div>",
+        )
+
+    def test_long_outline(self):
+        md = "\n".join("  " * (i % 50) + "- x" for i in range(20000))
+        markdown_list = classify_block(md)[1]
+        self.assertEqual(len(markdown_list.items), 400)
+        self.assertEqual(markdown_to_html_node(md).to_html().count("<li>"), 20000)
+
     def test_mixed_blocks():
         md = """# Main Heading
 
@@ -333,6 +443,51 @@ text
         html = node.to_html()
         self.assertEqual(html, "<div><p>Just a single paragraph</p></div>")
 
+    def test_urls_resolved_but_code_untouched(self):
+        md = """[Contact](/contact) and ![logo](/images/logo.png)
+
+```
+<a href="/contact">raw html sample</a>
+```
+"""
+        node = markdown_to_html_node(md, make_url_resolver("/site/"))
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><p><a href="/site/contact">Contact</a> and <img src="/site/images/logo.png" alt="logo"></img></p>'
+            '<pre><code><a href="/contact">raw html sample</a>\n</code></pre></div>',
+        )
+
+class TestMarkdownToDocument(unittest.TestCase):
+    def test_title_and_outline(self):
+        md = "## Intro\n\n# Title\ncontinued\n\ntext\n\n### Part *one*\n\n# Second"
+        document = markdown_to_document(md)
+        self.assertEqual(document.title, "Title")
+        self.assertEqual(
+            document.headings,
+            [(2, "Intro"), (1, "Title"), (3, "Part *one*"), (1, "Second")],
+        )
+        self.assertEqual(document.block_count, 5)
+        self.assertEqual(document.node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_heading_markers_in_other_blocks_ignored(self):
+        md = "```\n# not a title\n```\n\n####### seven\n\n#tag"
+        document = markdown_to_document(md)
+        self.assertIsNone(document.title)
+        self.assertEqual(document.headings, [])
+
+    def test_image_urls(self):
+        md = "# Title ![logo](/images/logo.png)\n\n![a](/images/a.png) and ![b](https://example.com/b.gif)\n\ntext"
+        document = markdown_to_document(md)
+        self.assertEqual(document.image_urls, {"/images/logo.png", "/images/a.png", "https://example.com/b.gif"})
+
+    def test_heading_level_and_text(self):
+        self.assertEqual(heading_level_and_text("###### Six"), (6, "Six"))
+        self.assertEqual(heading_level_and_text("#  Spaced  \nnext"), (1, "Spaced"))
+        self.assertIsNone(heading_level_and_text("####### Seven"))
+        self.assertIsNone(heading_level_and_text("#NoSpace"))
+        self.assertIsNone(heading_level_and_text("text"))
+
 def test_extract_title():
     # Test normal case
     markdown = "# My Title\nSome content"
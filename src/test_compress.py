@@ -0,0 +1,56 @@
+import gzip
+import os
+import unittest
+from testutil import TempDirTestCase
+from compress import MIN_COMPRESS_SIZE, Precompressor, encoders, precompress_file, should_compress
+
+
+class TestPrecompress(TempDirTestCase):
+    def test_should_compress(self):
+        self.assertTrue(should_compress("docs/index.HTML", MIN_COMPRESS_SIZE))
+        self.assertFalse(should_compress("docs/index.html", MIN_COMPRESS_SIZE - 1))
+        self.assertFalse(should_compress("docs/images/a.png", 10 * MIN_COMPRESS_SIZE))
+
+    def test_writes_gzip_sibling_with_source_mtime(self):
+        content = "<p>one ring</p>\n" * 200
+        path = self.write("index.html", content)
+        self.assertEqual(precompress_file(path), len(encoders()))
+        with gzip.open(path + ".gz", 'rt') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(os.stat(path + ".gz").st_mtime_ns, os.stat(path).st_mtime_ns)
+
+    def test_unchanged_source_is_skipped(self):
+        path = self.write("index.css", "body { color: red; }\n" * 100)
+        precompress_file(path)
+        self.assertEqual(precompress_file(path), 0)
+
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+        self.assertEqual(precompress_file(path), len(encoders()))
+
+    def test_small_and_binary_files_are_left_alone(self):
+        small = self.write("small.html", "<p>hi</p>")
+        image = self.write("image.png", "x" * 10_000)
+        self.assertEqual(precompress_file(small), 0)
+        self.assertEqual(precompress_file(image), 0)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["image.png", "small.html"])
+
+    def test_siblings_removed_when_no_longer_compressed(self):
+        path = self.write("index.html", "<p>one ring</p>\n" * 200)
+        precompress_file(path)
+        self.write(path, "<p>hi</p>")
+        self.assertEqual(precompress_file(path), 0)
+        self.assertEqual(os.listdir(self.dir), ["index.html"])
+
+    def test_precompressor_pool(self):
+        paths = [self.write(f"page{n}.html", f"<p>{n}</p>\n" * 500) for n in range(10)]
+        compressor = Precompressor(workers=3)
+        for path in paths:
+            compressor.submit(path)
+        self.assertEqual(compressor.wait(), 10 * len(encoders()))
+        for path in paths:
+            compressor.submit(path)
+        self.assertEqual(compressor.close(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
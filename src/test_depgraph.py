@@ -0,0 +1,49 @@
+import unittest
+from depgraph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set_dependencies("docs/index.html", {
+            "source:content/index.md": "s1", "template:template.html": "t1", "image:/images/a.png": "[1, 1, []]",
+        })
+        self.graph.set_dependencies("docs/blog/index.html", {
+            "source:content/blog/index.md": "s2", "template:template.html": "t1",
+        })
+
+    def test_dependents(self):
+        self.assertEqual(self.graph.dependents("template:template.html"), {"docs/index.html", "docs/blog/index.html"})
+        self.assertEqual(self.graph.dependents("image:/images/a.png"), {"docs/index.html"})
+        self.assertEqual(self.graph.dependents("image:/images/b.png"), set())
+
+    def test_dirty_only_includes_outputs_built_against_old_stamps(self):
+        stamps = {"template:template.html": "t1", "image:/images/a.png": "[2, 2, []]"}
+        self.assertEqual(self.graph.dirty(stamps.get, {"template", "image"}), {"docs/index.html"})
+        stamps["template:template.html"] = "t2"
+        self.assertEqual(self.graph.dirty(stamps.get, {"template"}), {"docs/index.html", "docs/blog/index.html"})
+
+    def test_dirty_looks_up_each_dependency_once(self):
+        looked_up = []
+        self.graph.dirty(lambda key: looked_up.append(key), {"source", "template", "image"})
+        self.assertEqual(sorted(looked_up), sorted(set(looked_up)))
+        self.assertEqual(len(looked_up), 4)
+
+    def test_removed_image_dirties_its_pages(self):
+        self.assertEqual(self.graph.dirty(lambda key: None, {"image"}), {"docs/index.html"})
+
+    def test_set_dependencies_replaces_edges(self):
+        self.graph.set_dependencies("docs/index.html", {"source:content/index.md": "s1"})
+        self.assertEqual(self.graph.dependents("image:/images/a.png"), set())
+        self.assertNotIn("image:/images/a.png", self.graph.reverse)
+
+    def test_round_trip(self):
+        graph = DependencyGraph(self.graph.to_data())
+        self.assertEqual(graph.reverse, self.graph.reverse)
+        graph.remove("docs/index.html")
+        self.assertEqual(len(graph), 1)
+        self.assertEqual(graph.dependents("template:template.html"), {"docs/blog/index.html"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+import unittest
+import urllib.request
+from testutil import TempDirTestCase
+from devserver import DevServer, PollingWatcher, LIVERELOAD_PATH, make_watcher
+
+
+class TestWatchers(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.dir, "content")
+        self.page = self.write("content/page.md", "# Page")
+
+    def assertReportsChange(self, watcher, change, expected):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(watcher.wait()), daemon=True)
+        thread.start()
+        time.sleep(0.1)
+        change()
+        thread.join(5)
+        watcher.close()
+        self.assertTrue(result, "watcher did not report a change")
+        self.assertIn(expected, {os.path.normpath(p) for p in result[0]})
+
+    def test_polling_watcher_reports_modified_file(self):
+        watcher = PollingWatcher([self.root], interval=0.02)
+
+        def change():
+            with open(self.page, 'w') as f:
+                f.write("# Page, but longer")
+
+        self.assertReportsChange(watcher, change, self.page)
+
+    def test_polling_watcher_reports_deleted_file(self):
+        watcher = PollingWatcher([self.root], interval=0.02)
+        self.assertReportsChange(watcher, lambda: os.remove(self.page), self.page)
+
+    def test_default_watcher_reports_new_file(self):
+        watcher = make_watcher([self.root])
+        new_page = os.path.join(self.root, "new.md")
+
+        def change():
+            with open(new_page, 'w') as f:
+                f.write("# New")
+
+        self.assertReportsChange(watcher, change, new_page)
+
+
+class TestDevServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("index.html", "<html><body><p>hi</p></body></html>")
+        self.server = DevServer(self.dir, port=0)
+        self.server.start()
+        self.base = f"http://localhost:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_injects_livereload_script(self):
+        with urllib.request.urlopen(self.base + "/") as response:
+            body = response.read().decode()
+        self.assertIn(LIVERELOAD_PATH, body)
+        self.assertTrue(body.endswith("</body></html>"))
+
+    def test_livereload_returns_new_version_after_notify(self):
+        threading.Timer(0.1, self.server.notify_reload).start()
+        with urllib.request.urlopen(f"{self.base}{LIVERELOAD_PATH}?version=0") as response:
+            self.assertEqual(response.read().decode(), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from testutil import TempDirTestCase
+from feeds import atom_date, make_absolute_url, w3c_date, write_atom_feed, write_sitemaps
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+class TestHelpers(unittest.TestCase):
+    def test_make_absolute_url(self):
+        self.assertEqual(make_absolute_url("/site/", "https://example.com/")("/blog/"), "https://example.com/site/blog/")
+        for site_url in ["", "example.com", "/site/", "ftp://example.com"]:
+            with self.assertRaises(ValueError):
+                make_absolute_url("/", site_url)
+
+    def test_dates(self):
+        self.assertEqual(w3c_date("2024-01-31T10:00"), "2024-01-31")
+        self.assertIsNone(w3c_date("last tuesday"))
+        self.assertIsNone(w3c_date(None))
+        self.assertEqual(atom_date("2024-01-31"), "2024-01-31T00:00:00Z")
+        self.assertEqual(atom_date("2024-01-31T10:00:00"), "2024-01-31T10:00:00Z")
+        self.assertEqual(atom_date("2024-01-31T10:00:00+02:00"), "2024-01-31T10:00:00+02:00")
+        self.assertEqual(atom_date("2024-01-31T10:00"), "2024-01-31T10:00:00Z")
+        for date in ["2024/1/2", "soon", "2024-13-01", "2024-01-31 junk", "", None]:
+            self.assertIsNone(atom_date(date), date)
+
+
+class TestSitemaps(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.absolute_url = make_absolute_url("/site/", "https://example.com")
+
+    def locs(self, name, tag="url"):
+        root = ET.parse(os.path.join(self.dir, name)).getroot()
+        return [element.find(f"{SITEMAP_NS}loc").text for element in root.iter(f"{SITEMAP_NS}{tag}")]
+
+    def test_single_sitemap(self):
+        urls = [("/", None), ("/blog/a&b/", "2024-01-31")]
+        self.assertEqual(write_sitemaps(iter(urls), self.dir, self.absolute_url), 2)
+        self.assertEqual(self.locs("sitemap.xml"), ["https://example.com/site/", "https://example.com/site/blog/a&b/"])
+        self.assertEqual(sorted(os.listdir(self.dir)), ["sitemap.xml"])
+
+    def test_split_into_sitemap_index(self):
+        urls = ((f"/page/{n}/", None) for n in range(5))
+        self.assertEqual(write_sitemaps(urls, self.dir, self.absolute_url, max_urls=2), 5)
+        self.assertEqual(self.locs("sitemap.xml", "sitemap"), [
+            f"https://example.com/site/sitemap-{n}.xml" for n in (1, 2, 3)
+        ])
+        self.assertEqual(self.locs("sitemap-3.xml"), ["https://example.com/site/page/4/"])
+
+        # A smaller site later removes the parts it no longer needs
+        write_sitemaps(iter([("/", None)]), self.dir, self.absolute_url, max_urls=2)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["sitemap.xml"])
+
+    def test_unchanged_sitemap_keeps_its_mtime(self):
+        write_sitemaps(iter([("/", None)]), self.dir, self.absolute_url)
+        path = os.path.join(self.dir, "sitemap.xml")
+        os.utime(path, ns=(0, 1_000_000_000))
+        write_sitemaps(iter([("/", None)]), self.dir, self.absolute_url)
+        self.assertEqual(os.stat(path).st_mtime_ns, 1_000_000_000)
+
+    def test_empty_site(self):
+        self.assertEqual(write_sitemaps(iter([]), self.dir, self.absolute_url), 0)
+        self.assertEqual(self.locs("sitemap.xml"), [])
+
+
+class TestAtomFeed(unittest.TestCase):
+    def test_newest_dated_entries(self):
+        entries = [
+            {"title": f"Post {n}", "date": f"2024-01-{n:02d}", "tags": ["elves"], "url": f"/blog/{n}/"}
+            for n in range(1, 11)
+        ]
+        entries.append({"title": "About", "date": None, "tags": [], "url": "/about/"})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feed.xml")
+            self.assertEqual(write_atom_feed(iter(entries), path, make_absolute_url("/", "https://x.org"),
+                                             "Fans & Friends", size=3), 3)
+            root = ET.parse(path).getroot()
+        self.assertEqual(root.find(f"{ATOM_NS}title").text, "Fans & Friends")
+        self.assertEqual(root.find(f"{ATOM_NS}updated").text, "2024-01-10T00:00:00Z")
+        feed_entries = root.findall(f"{ATOM_NS}entry")
+        self.assertEqual([e.find(f"{ATOM_NS}title").text for e in feed_entries], ["Post 10", "Post 9", "Post 8"])
+        self.assertEqual(feed_entries[0].find(f"{ATOM_NS}id").text, "https://x.org/blog/10/")
+        self.assertEqual(feed_entries[0].find(f"{ATOM_NS}category").get("term"), "elves")
+
+    def test_invalid_dates_are_left_out(self):
+        entries = [
+            {"title": "Good", "date": "2024-01-02", "tags": [], "url": "/good/"},
+            {"title": "Bad", "date": "2024/1/2", "tags": [], "url": "/bad/"},
+            {"title": "Soon", "date": "soon", "tags": [], "url": "/soon/"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()) as log:
+            path = os.path.join(tmp, "feed.xml")
+            self.assertEqual(write_atom_feed(entries, path, make_absolute_url("/", "https://x.org"), "Fans"), 1)
+            root = ET.parse(path).getroot()
+        self.assertEqual([e.find(f"{ATOM_NS}title").text for e in root.findall(f"{ATOM_NS}entry")], ["Good"])
+        self.assertIn("/bad/", log.getvalue())
+
+    def test_no_dated_entries_no_feed(self):
+        entries = [{"title": "About", "date": None, "tags": [], "url": "/about/"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feed.xml")
+            self.assertEqual(write_atom_feed(entries, path, make_absolute_url("/", "https://x.org"), "Fans"), 0)
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import io
+import unittest
+from frontmatter import split_front_matter, parse_front_matter
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_no_front_matter_keeps_every_line(self):
+        metadata, lines = split_front_matter(["# Title\n", "\n", "text\n"])
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(lines), ["# Title\n", "\n", "text\n"])
+
+    def test_empty_source(self):
+        metadata, lines = split_front_matter([])
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(lines), [])
+
+    def test_stops_reading_at_closing_fence(self):
+        source = io.StringIO("---\ntitle: Hello\n---\n# Body\n\ntext\n")
+        metadata, lines = split_front_matter(source)
+        self.assertEqual(metadata, {"title": "Hello"})
+        self.assertEqual(source.readline(), "# Body\n")
+
+    def test_windows_line_endings(self):
+        metadata, lines = split_front_matter(["---\r\n", "draft: true\r\n", "---\r\n", "text\r\n"])
+        self.assertEqual(metadata, {"draft": True})
+        self.assertEqual(list(lines), ["text\r\n"])
+
+    def test_unclosed_fence_is_markdown(self):
+        metadata, lines = split_front_matter(["---\n", "title: Hello\n", "# Body\n"])
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(lines), ["---\n", "title: Hello\n", "# Body\n"])
+
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_values(self):
+        metadata = parse_front_matter([
+            "title: \"Quoted: with colon\"",
+            "subtitle: 'single'",
+            "date: 2024-01-31",
+            "order: 3",
+            "draft: false",
+            "summary: plain text # trailing comment",
+            "# a comment line",
+            "",
+            "tags: [tolkien, elves]",
+            "empty: []",
+        ])
+        self.assertEqual(metadata, {
+            "title": "Quoted: with colon",
+            "subtitle": "single",
+            "date": "2024-01-31",
+            "order": 3,
+            "draft": False,
+            "summary": "plain text",
+            "tags": ["tolkien", "elves"],
+            "empty": [],
+        })
+
+    def test_block_list(self):
+        metadata = parse_front_matter(["tags:", "  - tolkien", "  - 'middle earth'", "author: JRR"])
+        self.assertEqual(metadata, {"tags": ["tolkien", "middle earth"], "author": "JRR"})
+
+    def test_key_without_value(self):
+        self.assertEqual(parse_front_matter(["summary:"]), {"summary": None})
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["- orphan item"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a key value line"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import io
+import pickle
 import unittest
-from htmlnode import LeafNode, ParentNode, HTMLNode
+from htmlnode import LeafNode, ParentNode, HTMLNode, Minifier, RawHTML
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -108,6 +110,82 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_write_html_streams_chunks(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "Normal text"), LeafNode("b", "Bold text")]),
+                LeafNode("a", "link", {"href": "https://www.google.com"}),
+            ],
+        )
+        chunks = []
+
+        class Recorder:
+            def write(self, chunk):
+                chunks.append(chunk)
+
+        node.write_html(Recorder())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in [HTMLNode("p"), LeafNode("b", "bold"), ParentNode("div", [])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
+    def test_nodes_pickle(self):
+        node = ParentNode("p", [LeafNode("a", "link", {"href": "/x"}), LeafNode(None, "text")])
+        copy = pickle.loads(pickle.dumps(node))
+        self.assertEqual(copy.to_html(), node.to_html())
+        self.assertEqual(repr(copy), repr(node))
+
+    def test_write_html_no_children(self):
+        node = ParentNode("div", None)
+        with self.assertRaises(ValueError):
+            node.write_html(io.StringIO())
+
+
+
+class TestMinifiedHTML(unittest.TestCase):
+    def test_minified_tree(self):
+        node = ParentNode("p", [
+            LeafNode(None, "two  spaces\nand a newline "),
+            LeafNode("a", "link", {"href": "/blog/tom/", "title": "Old Tom"}),
+            LeafNode("img", "", {"src": "/images/tom.png", "alt": ""}),
+        ], {"class": "intro"})
+        minifier = Minifier()
+        self.assertEqual(
+            node.to_html(minifier),
+            '<p class=intro>two spaces and a newline <a href=/blog/tom/ title="Old Tom">link</a>'
+            '<img src=/images/tom.png alt=""></p>',
+        )
+        self.assertEqual(minifier.saved, len(node.to_html()) - len(node.to_html(Minifier())))
+
+    def test_every_node_takes_a_minifier(self):
+        nodes = [LeafNode("a", "x  y", {"href": "/b"}), RawHTML("<p>a  b</p>"), ParentNode("p", [LeafNode(None, "a  b")])]
+        self.assertEqual([node.to_html(Minifier()) for node in nodes], ["<a href=/b>x y</a>", "<p>a  b</p>", "<p>a b</p>"])
+        with self.assertRaises(NotImplementedError):
+            HTMLNode().to_html(Minifier())
+
+    def test_non_breaking_spaces_kept(self):
+        node = ParentNode("p", [LeafNode(None, "caf\u00e9\u00a0\u00a0 \n  au\u00a0lait")])
+        minifier = Minifier()
+        self.assertEqual(node.to_html(minifier), "<p>caf\u00e9\u00a0\u00a0 au\u00a0lait</p>")
+        self.assertEqual(minifier.saved, len(node.to_html().encode()) - len(node.to_html(Minifier()).encode()))
+
+    def test_pre_and_code_preserved(self):
+        node = ParentNode("div", [
+            ParentNode("pre", [LeafNode("code", "def f():\n    return  1\n")]),
+            LeafNode("code", "a  b"),
+        ])
+        self.assertEqual(node.to_html(Minifier()), "<div><pre><code>def f():\n    return  1\n</code></pre><code>a  b</code></div>")
+
+    def test_raw_html_written_verbatim(self):
+        raw = RawHTML("<pre><code>a  b</code></pre>")
+        self.assertEqual(raw.to_html(), "<pre><code>a  b</code></pre>")
+        self.assertEqual(ParentNode("div", [raw]).to_html(Minifier()), "<div><pre><code>a  b</code></pre></div>")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,126 @@
+import os
+import struct
+import unittest
+from testutil import TempDirTestCase
+from images import IMAGE_CACHE_NAME, ImageCatalog, PNG_SIGNATURE, image_dimensions, variant_url
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+def png_header(width, height):
+    return PNG_SIGNATURE + struct.pack(">I", 13) + b"IHDR" + struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof
+
+
+class TestImageDimensions(TempDirTestCase):
+    def test_png(self):
+        self.assertEqual(image_dimensions(self.write("a.png", png_header(1026, 388))), (1026, 388))
+
+    def test_gif(self):
+        self.assertEqual(image_dimensions(self.write("a.gif", b"GIF89a" + struct.pack("<HH", 32, 16))), (32, 16))
+
+    def test_jpeg(self):
+        self.assertEqual(image_dimensions(self.write("a.jpg", jpeg_header(640, 480))), (640, 480))
+
+    def test_unknown_format(self):
+        self.assertIsNone(image_dimensions(self.write("a.png", b"not an image")))
+
+    def test_variant_url(self):
+        self.assertEqual(variant_url("/images/a.b.png", 480), "/images/a.b-480w.png")
+
+
+class TestImageCatalog(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.dir, "static")
+        self.dest = os.path.join(self.dir, "docs")
+        self.cache_path = os.path.join(self.dir, ".build", IMAGE_CACHE_NAME)
+
+    def test_scan_records_dimensions(self):
+        self.write("static/images/a.png", png_header(100, 50))
+        self.write("static/images/notes.txt", b"not an image")
+        catalog = ImageCatalog(self.static, self.dest)
+        self.assertEqual(catalog.scan(), (1, []))
+        self.assertEqual(list(catalog.entries), ["/images/a.png"])
+        self.assertEqual(catalog.entries["/images/a.png"]["width"], 100)
+
+    def test_unchanged_images_are_not_reprocessed(self):
+        self.write("static/images/a.png", png_header(100, 50))
+        catalog = ImageCatalog(self.static, self.dest, self.cache_path)
+        catalog.scan()
+        catalog.save()
+
+        reloaded = ImageCatalog(self.static, self.dest, self.cache_path).load()
+        self.assertEqual(reloaded.scan(), (0, []))
+        self.assertEqual(reloaded.fingerprint(), catalog.fingerprint())
+
+    def test_missing_variant_is_regenerated(self):
+        self.write("static/images/a.png", png_header(1000, 500))
+
+        def make_variants(path, url, width, height):
+            output = self.write("docs/images/a-480w.png", b"variant")
+            made.append(output)
+            return [[480, 240, "/images/a-480w.png"]]
+
+        made = []
+        catalog = ImageCatalog(self.static, self.dest, self.cache_path)
+        catalog.variants = True
+        catalog._make_variants = make_variants
+        catalog.scan()
+        self.assertEqual(catalog.scan(), (0, []))
+
+        os.remove(made[0])
+        self.assertEqual(catalog.scan(), (1, []))
+        self.assertTrue(os.path.exists(made[0]))
+
+    def test_fingerprint_follows_dimensions(self):
+        path = self.write("static/images/a.png", png_header(100, 50))
+        catalog = ImageCatalog(self.static, self.dest)
+        catalog.scan()
+        before = catalog.fingerprint()
+
+        self.write("static/images/a.png", png_header(200, 100))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+        self.assertEqual(catalog.scan(), (1, []))
+        self.assertNotEqual(catalog.fingerprint(), before)
+
+        os.remove(path)
+        catalog.scan()
+        self.assertEqual(catalog.entries, {})
+
+    def test_attributes(self):
+        self.write("static/images/a.png", png_header(100, 50))
+        catalog = ImageCatalog(self.static, self.dest)
+        catalog.scan()
+        self.assertEqual(
+            catalog.attributes("/images/a.png"),
+            {"width": "100", "height": "50", "loading": "lazy", "decoding": "async"},
+        )
+        self.assertEqual(catalog.attributes("https://example.com/a.png"), {"loading": "lazy", "decoding": "async"})
+
+    def test_srcset_lists_variants(self):
+        catalog = ImageCatalog(self.static, self.dest)
+        catalog.entries["/images/a.png"] = {
+            "width": 1000, "height": 500, "variants": [[480, 240, "/images/a-480w.png"], [960, 480, "/images/a-960w.png"]],
+        }
+        props = catalog.attributes("/images/a.png", lambda url: "/site" + url)
+        self.assertEqual(props["srcset"], "/site/images/a-480w.png 480w, /site/images/a-960w.png 960w, /site/images/a.png 1000w")
+        self.assertEqual(props["sizes"], "(max-width: 1000px) 100vw, 1000px")
+
+    def test_image_node_gets_attributes(self):
+        self.write("static/images/a.png", png_header(100, 50))
+        catalog = ImageCatalog(self.static, self.dest)
+        catalog.scan()
+        node = text_node_to_html_node(TextNode("alt text", TextType.IMAGE, "/images/a.png"), images=catalog)
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/images/a.png" alt="alt text" width="100" height="50" loading="lazy" decoding="async"></img>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import contextlib
+import io
+import os
+import unittest
+from testutil import TempDirTestCase
+from listings import BLOG_PREFIX, build_listings, generate_listings, listing_node, paginate, tag_slug, tag_slugs
+from manifest import BuildManifest, MANIFEST_NAME
+from site_index import SiteIndex
+from urls import make_url_resolver
+
+
+def post(number, tags=(), date=""):
+    if date == "":
+        date = f"2024-01-01T{number:06d}"
+    return {"title": f"Post {number}", "date": date, "tags": list(tags), "url": f"/blog/{number}/", "word_count": 1}
+
+
+class TestPaginate(unittest.TestCase):
+    def test_single_page(self):
+        listings = paginate("/blog/", "Blog", [post(2), post(1)], per_page=10)
+        self.assertEqual(len(listings), 1)
+        self.assertEqual(listings[0].url, "/blog/")
+        self.assertEqual([item[1] for item in listings[0].items], ["Post 2", "Post 1"])
+        self.assertIsNone(listings[0].newer)
+        self.assertIsNone(listings[0].older)
+
+    def test_pages_numbered_from_oldest(self):
+        posts = [post(n) for n in range(25, 0, -1)]
+        listings = paginate("/blog/", "Blog", posts, per_page=10)
+        self.assertEqual([l.url for l in listings], ["/blog/page/1/", "/blog/"])
+        self.assertEqual([item[1] for item in listings[0].items], [f"Post {n}" for n in range(10, 0, -1)])
+        # The front page takes the remainder rather than leaving a short last page
+        self.assertEqual(len(listings[1].items), 15)
+        self.assertEqual(listings[0].newer, "/blog/")
+        self.assertEqual(listings[1].older, "/blog/page/1/")
+
+    def test_new_post_leaves_numbered_pages_alone(self):
+        posts = [post(n) for n in range(35, 0, -1)]
+        before = {l.url: l.fingerprint({}) for l in paginate("/blog/", "Blog", posts, per_page=10)}
+        after = {l.url: l.fingerprint({}) for l in paginate("/blog/", "Blog", [post(36)] + posts, per_page=10)}
+        changed = [url for url in after if before.get(url) != after[url]]
+        self.assertEqual(changed, ["/blog/"])
+
+
+class TestBuildListings(unittest.TestCase):
+    def setUp(self):
+        self.index = SiteIndex()
+        self.index.update("content/index.md", "/", {"title": "Home", "date": None, "tags": [], "word_count": 1})
+        for number, tags, date in [(1, ["Elves"], "2023-05-01"), (2, ["Elves", "Big Dwarves"], "2024-02-01"), (3, [], None)]:
+            entry = post(number, tags, date)
+            self.index.update(f"content/blog/{number}.md", entry.pop("url"), entry)
+
+    def test_plans_blog_tag_and_archive_pages(self):
+        listings = {l.url: l for l in build_listings(self.index)}
+        self.assertEqual(sorted(listings), [
+            "/blog/", "/blog/archive/", "/blog/archive/2023/", "/blog/archive/2024/",
+            "/blog/tags/", "/blog/tags/big-dwarves/", "/blog/tags/elves/",
+        ])
+        self.assertEqual([item[1] for item in listings["/blog/"].items], ["Post 2", "Post 1", "Post 3"])
+        self.assertEqual([item[1] for item in listings["/blog/tags/elves/"].items], ["Post 2", "Post 1"])
+        self.assertEqual(listings["/blog/tags/"].items[0], ("/blog/tags/big-dwarves/", "Big Dwarves (1)", None))
+        self.assertEqual([item[0] for item in listings["/blog/archive/"].items], ["/blog/archive/2024/", "/blog/archive/2023/"])
+
+    def test_no_posts_no_listings(self):
+        self.assertEqual(build_listings(SiteIndex()), [])
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Middle Earth!"), "middle-earth")
+        self.assertEqual(tag_slug("???"), "tag")
+
+    def test_tags_sharing_a_slug(self):
+        for number, tags in [(4, ["python", "C++"]), (5, ["Python", "C"])]:
+            entry = post(number, tags, "2024-03-01")
+            self.index.update(f"content/blog/{number}.md", entry.pop("url"), entry)
+        listings = {l.url: l for l in build_listings(self.index)}
+        # Case variants are merged, under the newest post's spelling
+        self.assertEqual([item[1] for item in listings["/blog/tags/python/"].items], ["Post 4", "Post 5"])
+        self.assertEqual(listings["/blog/tags/python/"].title, "Posts tagged python")
+        # Different tags with one slug get different URLs
+        urls = [url for url, label, _ in listings["/blog/tags/"].items if label.startswith("C")]
+        self.assertEqual(len(set(urls)), 2)
+        self.assertIn("/blog/tags/c/", urls)
+        self.assertEqual(tag_slugs(["C++"]), {"C++": "c"})
+
+    def test_listing_node(self):
+        listing = paginate("/blog/", "Blog", [post(1, date="2024-01-01")])[0]
+        listing.items[0] = ("/blog/1/", "A <b> & C", "2024-01-01")
+        html = listing_node(listing, make_url_resolver("/site/")).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1>Blog</h1><ul class="listing"><li><a href="/site/blog/1/">A &lt;b&gt; &amp; C</a> '
+            '<time datetime="2024-01-01">2024-01-01</time></li></ul></div>',
+        )
+
+
+class TestGenerateListings(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.dir, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.index = SiteIndex()
+
+    def add_posts(self, numbers, tags=()):
+        for number in numbers:
+            entry = post(number, tags)
+            self.index.update(f"content/blog/{number}.md", entry.pop("url"), entry)
+
+    def build(self):
+        manifest = BuildManifest.load(os.path.join(self.dest, MANIFEST_NAME))
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = generate_listings(self.index, self.template, self.dest, "/", manifest, per_page=10)
+        manifest.save()
+        return result
+
+    def test_incremental(self):
+        self.add_posts(range(1, 51))
+        written, unchanged, stale = self.build()
+        # Four numbered pages and the front page, the 2024 archive and the archive index
+        self.assertEqual((written, unchanged, stale), (7, 0, []))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "page", "1", "index.html")))
+
+        self.assertEqual(self.build(), (0, 7, []))
+
+        # One more post touches the front page and the archive, not the numbered pages
+        self.add_posts([51])
+        self.assertEqual(self.build(), (3, 4, []))
+
+    def test_removed_listings_are_stale(self):
+        self.add_posts(range(1, 3), tags=["elves"])
+        self.build()
+        for source in list(self.index.pages):
+            self.index.pages[source]["tags"] = []
+        written, unchanged, stale = self.build()
+        self.assertEqual(sorted(stale), sorted([
+            os.path.join(self.dest, "blog", "tags", "elves", "index.html"),
+            os.path.join(self.dest, "blog", "tags", "index.html"),
+        ]))
+
+    def test_content_page_wins_url(self):
+        self.add_posts([1])
+        self.build()
+        self.index.update("content/blog/index.md", BLOG_PREFIX, {"title": "Blog", "date": None, "tags": [], "word_count": 1})
+        written, unchanged, stale = self.build()
+        self.assertEqual((written, stale), (0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
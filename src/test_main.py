@@ -0,0 +1,183 @@
+import contextlib
+import io
+import os
+import shutil
+import unittest
+from testutil import TempDirTestCase
+import main
+from manifest import BuildManifest, MANIFEST_NAME
+from site_index import SiteIndex
+
+SITE_URL = "https://example.com"
+
+
+class SiteTestCase(TempDirTestCase):
+    """A small site in a temporary directory, which is the working directory during each test"""
+
+    def setUp(self):
+        super().setUp()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir)
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body {}")
+        self.write("content/index.md", "# Home\n\nWelcome")
+        self.write("content/blog/tom/index.md", "---\ndate: 2024-01-02\ntags: [Tolkien]\n---\n# Tom\n\nA post")
+        self.manifest = BuildManifest(os.path.join(main.BUILD_DIR, MANIFEST_NAME))
+        self.index = SiteIndex()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        super().tearDown()
+
+    def read(self, path):
+        with open(path, 'r') as f:
+            return f.read()
+
+    def build(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build_site("/", self.manifest, index=self.index, site_url=SITE_URL, **options)
+
+    def rebuild(self, *paths):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.rebuild_changed({os.path.normpath(path) for path in paths}, "/", self.manifest, index=self.index,
+                                 site_url=SITE_URL)
+
+
+class TestBuildSite(SiteTestCase):
+    def test_sitemap_and_feed_use_absolute_urls(self):
+        self.build()
+        self.assertIn("<loc>https://example.com/blog/tom/</loc>", self.read("docs/sitemap.xml"))
+        self.assertIn("<id>https://example.com/</id>", self.read("docs/feed.xml"))
+
+    def test_no_sitemap_or_feed_without_site_url(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build_site("/", self.manifest, index=self.index)
+        self.assertTrue(os.path.exists("docs/blog/tom/index.html"))
+        self.assertFalse(os.path.exists("docs/sitemap.xml"))
+        self.assertFalse(os.path.exists("docs/feed.xml"))
+
+    def test_sitemap_and_feed_removed_without_site_url(self):
+        self.build()
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build_site("/", self.manifest, index=self.index)
+        self.assertFalse(os.path.exists("docs/sitemap.xml"))
+        self.assertFalse(os.path.exists("docs/feed.xml"))
+
+    def test_site_url_must_be_absolute(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main.parse_args(["--site-url", "example.com"])
+        self.assertEqual(main.parse_args(["--site-url", "https://example.com"]).site_url, "https://example.com")
+
+
+class TestGeneratePages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(1, 6):
+            self.write(f"content/blog/{number}.md", f"# Post {number}\n\n- item {number}")
+
+    def generate(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.generate_pages_recursive("content", "template.html", "docs", "/", self.manifest, index=self.index,
+                                          **options)
+
+    def outputs(self):
+        pages = {}
+        for root, _, files in os.walk("docs"):
+            for name in files:
+                pages[os.path.join(root, name)] = self.read(os.path.join(root, name))
+        return pages
+
+    def test_every_mode_writes_the_same_pages(self):
+        self.generate()
+        expected = self.outputs()
+        self.assertEqual(len(expected), 7)
+        for options in [{"jobs": 2}, {"pipeline": True}, {"pipeline": True, "jobs": 2}]:
+            shutil.rmtree("docs")
+            self.manifest = BuildManifest(self.manifest.path)
+            self.generate(**options)
+            self.assertEqual(self.outputs(), expected, options)
+
+    def test_failures_are_collected_in_every_mode(self):
+        self.write("content/blog/2.md", "No title")
+        self.write("content/blog/4.md", "---\nnot a key\n---\n# Post 4")
+        for options in [{}, {"jobs": 2}, {"pipeline": True}, {"pipeline": True, "jobs": 2}]:
+            shutil.rmtree("docs", ignore_errors=True)
+            self.manifest = BuildManifest(self.manifest.path)
+            self.index = SiteIndex()
+            with self.assertRaises(main.PageGenerationError) as raised:
+                self.generate(**options)
+            failed = [source for source, _ in raised.exception.failures]
+            self.assertEqual(failed, [os.path.join("content", "blog", "2.md"), os.path.join("content", "blog", "4.md")],
+                             options)
+            # The other pages are still written, indexed and recorded
+            self.assertTrue(os.path.exists(os.path.join("docs", "blog", "5.html")), options)
+            self.assertEqual(len(self.index), 5, options)
+            self.assertNotIn(failed[0], self.manifest.records["pages"])
+
+    def test_parallel_results_keep_page_order(self):
+        pages = [(os.path.join("content", "blog", f"{number}.md"), os.path.join("docs", "blog", f"{number}.html"))
+                 for number in range(5, 0, -1)]
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            entries, failures = main.generate_pages_parallel(pages, "template.html", "/", 3)
+        self.assertEqual(failures, [])
+        self.assertEqual([entry[0] for entry in entries], [source for source, _ in pages])
+        self.assertEqual([entry[2]["title"] for entry in entries], [f"Post {number}" for number in range(5, 0, -1)])
+        lines = [line for line in log.getvalue().splitlines() if line.startswith("Generating")]
+        self.assertEqual([line.split()[3] for line in lines], [source for source, _ in pages])
+
+
+class TestRebuildChanged(SiteTestCase):
+    def test_edited_page_is_rerendered(self):
+        self.build()
+        self.write("content/index.md", "# Home\n\nWelcome back")
+        self.rebuild("content/index.md")
+        self.assertIn("Welcome back", self.read("docs/index.html"))
+
+    def test_deleted_page_is_removed_with_template_change(self):
+        self.build()
+        self.rebuild("content/index.md")
+        self.write("template.html", "<title>{{ Title }}!</title>{{ Content }}")
+        shutil.rmtree("content/blog/tom")
+        self.rebuild("template.html", "content/blog/tom/index.md", "content/blog/tom")
+
+        self.assertIn("<title>Home!</title>", self.read("docs/index.html"))
+        self.assertFalse(os.path.exists("docs/blog/tom/index.html"))
+        self.assertNotIn("content/blog/tom/index.md", self.index)
+        self.assertNotIn("/blog/tom/", self.read("docs/sitemap.xml"))
+
+    def test_deleted_page_is_removed(self):
+        self.build()
+        os.remove("content/blog/tom/index.md")
+        self.rebuild("content/blog/tom/index.md")
+        self.assertFalse(os.path.exists("docs/blog/tom/index.html"))
+        self.assertNotIn("/blog/tom/", self.read("docs/sitemap.xml"))
+
+    def test_listings_of_deleted_post_are_removed(self):
+        self.build()
+        self.write("content/blog/new/index.md", "---\ndate: 2023-05-01\ntags: [Elves]\n---\n# New")
+        self.rebuild("content/blog/new/index.md")
+        self.assertTrue(os.path.exists("docs/blog/tags/elves/index.html"))
+        self.assertTrue(os.path.exists("docs/blog/archive/2023/index.html"))
+
+        shutil.rmtree("content/blog/new")
+        self.rebuild("content/blog/new")
+        self.assertFalse(os.path.exists("docs/blog/tags/elves/index.html"))
+        self.assertFalse(os.path.exists("docs/blog/archive/2023/index.html"))
+        self.assertTrue(os.path.exists("docs/blog/tags/tolkien/index.html"))
+
+    def test_named_template_change_rerenders_its_pages(self):
+        self.write("templates/post.html", "<h1>Post</h1>{{ Content }}")
+        self.write("content/blog/tom/index.md", "---\ntemplate: post\n---\n# Tom\n\nA post")
+        self.build()
+        self.assertIn("<h1>Post</h1>", self.read("docs/blog/tom/index.html"))
+        self.assertIn("<title>Home</title>", self.read("docs/index.html"))
+
+        home = os.stat("docs/index.html").st_mtime_ns
+        self.write("templates/post.html", "<h1>Post!</h1>{{ Content }}")
+        self.rebuild("templates/post.html")
+        self.assertIn("<h1>Post!</h1>", self.read("docs/blog/tom/index.html"))
+        self.assertEqual(os.stat("docs/index.html").st_mtime_ns, home)
+
+
+if __name__ == "__main__":
+    unittest.main()
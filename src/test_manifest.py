@@ -0,0 +1,106 @@
+import json
+import os
+import unittest
+from testutil import TempDirTestCase
+from manifest import BuildManifest, MANIFEST_NAME, MANIFEST_VERSION, hash_file
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.write("page.md", "# Title")
+        self.output = self.write("page.html", "<h1>Title</h1>")
+        self.manifest_path = os.path.join(self.dir, MANIFEST_NAME)
+
+    def test_missing_manifest_is_new(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.is_new)
+        self.assertTrue(manifest.changed("pages", self.source, self.output))
+
+    def test_unchanged_source_is_skipped(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.is_new)
+        self.assertFalse(manifest.changed("pages", self.source, self.output))
+
+    def test_changed_source_is_rebuilt(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.save()
+
+        self.write(self.source, "# A different title")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.changed("pages", self.source, self.output))
+
+    def test_missing_output_is_rebuilt(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.save()
+
+        os.remove(self.output)
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.changed("pages", self.source, self.output))
+
+    def test_prune_returns_outputs_of_vanished_sources(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.prune("pages"), [self.output])
+        self.assertEqual(manifest.records["pages"], {})
+
+    def test_settings_changed(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.settings_changed({"basepath": "/"}))
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.settings_changed({"basepath": "/"}))
+        self.assertTrue(manifest.settings_changed({"basepath": "/blog/"}))
+
+    def test_fingerprint_changed(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.fingerprint_changed("listings", "/blog/", "abc", self.output))
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.fingerprint_changed("listings", "/blog/", "abc", self.output))
+        self.assertTrue(manifest.fingerprint_changed("listings", "/blog/", "def", self.output))
+        self.assertEqual(manifest.prune("listings"), [])
+
+    def test_dependency_graph_is_saved_and_pruned(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.graph.set_dependencies(self.output, {"template:template.html": "abc"})
+        manifest.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertIn(self.output, manifest.graph)
+        manifest.prune("pages")
+        self.assertNotIn(self.output, manifest.graph)
+
+    def test_other_version_is_discarded(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.changed("pages", self.source, self.output)
+        manifest.save()
+        with open(self.manifest_path) as f:
+            data = json.load(f)
+        data["version"] = MANIFEST_VERSION - 1
+        with open(self.manifest_path, 'w') as f:
+            json.dump(data, f)
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.is_new)
+        self.assertEqual(manifest.records["pages"], {})
+
+    def test_digest_matches_content_hash(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.digest(self.source), hash_file(self.source))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import unittest
+from testutil import TempDirTestCase
+from outputs import AtomicOutput, OutputStats, write_if_changed
+
+
+class TestAtomicOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.dir, "index.html")
+        self.stats = OutputStats()
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_new_output_is_written(self):
+        self.assertTrue(write_if_changed(self.path, "<p>Frodo ✓</p>", self.stats))
+        self.assertEqual(self.read(), "<p>Frodo ✓</p>")
+        self.assertEqual(os.listdir(self.dir), ["index.html"])
+        self.assertEqual(self.stats.take(), (1, 0))
+
+    def test_unchanged_output_keeps_its_mtime(self):
+        write_if_changed(self.path, "<p>Sam</p>", self.stats)
+        os.utime(self.path, ns=(0, 1_000_000_000))
+        self.assertFalse(write_if_changed(self.path, "<p>Sam</p>", self.stats))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(os.listdir(self.dir), ["index.html"])
+
+        self.assertTrue(write_if_changed(self.path, "<p>Pippin</p>", self.stats))
+        self.assertEqual(self.read(), "<p>Pippin</p>")
+        self.assertEqual(self.stats.take(), (2, 1))
+        self.assertEqual(self.stats.take(), (0, 0))
+
+    def test_replaced_output_loses_compressed_siblings(self):
+        write_if_changed(self.path, "<p>one</p>", self.stats)
+        self.write(self.path + ".gz", b"stale")
+        write_if_changed(self.path, "<p>one</p>", self.stats)
+        self.assertTrue(os.path.exists(self.path + ".gz"))
+        write_if_changed(self.path, "<p>two</p>", self.stats)
+        self.assertFalse(os.path.exists(self.path + ".gz"))
+
+    def test_failed_output_leaves_existing_file(self):
+        write_if_changed(self.path, "<p>old</p>", self.stats)
+        with self.assertRaises(ValueError):
+            with AtomicOutput(self.path, self.stats) as output:
+                output.write("<p>half")
+                raise ValueError("render failed")
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(self.dir), ["index.html"])
+
+    def test_path_can_be_changed_before_closing(self):
+        output = AtomicOutput(os.path.join(self.dir, "part.xml"), self.stats)
+        output.write("<urlset/>")
+        self.assertEqual(output.size, 9)
+        output.path = self.path
+        output.close()
+        self.assertEqual(self.read(), "<urlset/>")
+        self.assertEqual(os.listdir(self.dir), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import unittest
+from testutil import TempDirTestCase
+from pipeline import OutputWriter, prefetch
+
+
+class TestPipeline(TempDirTestCase):
+    def test_prefetch_keeps_order_and_reports_unreadable_sources(self):
+        pages = [(self.write(f"{i}.md", f"# Page {i}"), f"{i}.html") for i in range(20)]
+        pages.insert(3, (os.path.join(self.dir, "missing.md"), "missing.html"))
+        items = list(prefetch(pages, depth=2))
+        self.assertEqual([(source, dest) for source, dest, _, _ in items], pages)
+        self.assertEqual(items[0][2:], ("# Page 0", None))
+        self.assertIsNone(items[3][2])
+        self.assertIn("FileNotFoundError", items[3][3])
+
+    def test_prefetch_stops_when_consumer_stops(self):
+        pages = [(self.write(f"{i}.md", "text"), f"{i}.html") for i in range(10)]
+        items = prefetch(pages, depth=1)
+        next(items)
+        # Closing must not hang on the reader blocked behind the full queue
+        items.close()
+
+    def test_output_writer(self):
+        written = []
+        writer = OutputWriter(depth=2, on_written=written.append)
+        paths = [os.path.join(self.dir, "blog", str(i), "index.html") for i in range(10)]
+        for i, path in enumerate(paths):
+            writer.write(path, f"<p>{i}</p>", f"content/{i}.md")
+        self.assertEqual(writer.close(), [])
+        self.assertEqual(written, paths)
+        with open(paths[7]) as f:
+            self.assertEqual(f.read(), "<p>7</p>")
+
+    def test_output_writer_reports_failures_by_key(self):
+        blocker = self.write("blocker", "not a directory")
+        writer = OutputWriter()
+        writer.write(os.path.join(blocker, "index.html"), "<p></p>", "content/bad.md")
+        writer.write(os.path.join(self.dir, "ok.html"), "<p></p>")
+        failures = writer.close()
+        self.assertEqual([key for key, _ in failures], ["content/bad.md"])
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "ok.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from profiling import BuildProfiler, NULL_PROFILER
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_nested_stages_charge_exclusive_time(self):
+        profiler = BuildProfiler()
+        with profiler.stage("outer", "page.md"):
+            time.sleep(0.01)
+            with profiler.stage("inner", "page.md"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(profiler.totals["inner"], 0.02)
+        self.assertLess(profiler.totals["outer"], 0.02)
+        self.assertAlmostEqual(
+            profiler.pages["page.md"], profiler.totals["outer"] + profiler.totals["inner"]
+        )
+        self.assertEqual(profiler.calls["outer"], 1)
+
+    def test_merge_combines_worker_results(self):
+        worker = BuildProfiler()
+        with worker.stage("inline", "a.md"):
+            pass
+        worker.count("pages")
+        profiler = BuildProfiler()
+        with profiler.stage("inline", "b.md"):
+            pass
+        profiler.merge(worker.to_dict())
+        self.assertEqual(profiler.calls["inline"], 2)
+        self.assertEqual(profiler.counters["pages"], 1)
+        self.assertEqual(set(profiler.pages), {"a.md", "b.md"})
+
+    def test_chrome_trace(self):
+        profiler = BuildProfiler(trace=True)
+        with profiler.stage("read", "a.md"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["name"], "read")
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"], {"page": "a.md"})
+
+    def test_null_profiler_is_transparent(self):
+        with NULL_PROFILER.stage("read"):
+            pass
+        NULL_PROFILER.count("pages")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from block_processing import markdown_to_html_node, render_block
+from htmlnode import Minifier
+from render_cache import BlockCache
+from urls import make_url_resolver
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hit_and_miss_counts(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("para"))
+        cache.put("para", "<p>para</p>")
+        self.assertEqual(cache.get("para"), ("<p>para</p>", 0))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(cache.get("a"), ("A", 0))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), ("C", 0))
+
+    def test_context_separates_entries(self):
+        site = BlockCache(context="/site/")
+        site.put("[a](/b)", "<p>site</p>")
+        root = BlockCache(context="/")
+        root.merge(site.take_new_entries())
+        self.assertIsNone(root.get("[a](/b)"))
+
+    def test_cached_render_matches_uncached(self):
+        md = "# Title\n\nSame note\n\n- a\n- b\n\nSame note\n\n[link](/x)"
+        resolve_url = make_url_resolver("/site/")
+        cache = BlockCache(context="/site/")
+        expected = markdown_to_html_node(md, resolve_url).to_html()
+        self.assertEqual(markdown_to_html_node(md, resolve_url, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(markdown_to_html_node(md, resolve_url, cache).to_html(), expected)
+        self.assertEqual(cache.misses, 4)
+
+    def test_hits_count_minify_savings(self):
+        block = "Some   spaced\ntext with [a link](/x)"
+        cache = BlockCache(context="/\0minify")
+        missed = Minifier()
+        html = render_block(block, cache=cache, minifier=missed).to_html()
+        hit = Minifier()
+        self.assertEqual(render_block(block, cache=cache, minifier=hit).to_html(), html)
+        self.assertEqual(cache.hits, 1)
+        self.assertGreater(missed.saved, 0)
+        self.assertEqual(hit.saved, missed.saved)
+
+    def test_save_and_load(self):
+        cache = BlockCache()
+        cache.put("a", "<p>a</p>", 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache.save(path)
+            loaded = BlockCache().load(path)
+        self.assertEqual(loaded.get("a"), ("<p>a</p>", 3))
+        self.assertEqual(loaded.take_new_entries(), {})
+
+    def test_load_missing_file(self):
+        cache = BlockCache().load("/nonexistent/cache.json")
+        self.assertEqual(len(cache.entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from testutil import TempDirTestCase
+from block_processing import markdown_to_document
+from site_index import SiteIndex, SITE_INDEX_NAME, page_entry, page_url, normalize_tags
+
+
+class TestPageHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs"), "/")
+        self.assertEqual(page_url("docs/blog/tom/index.html", "docs"), "/blog/tom/")
+        self.assertEqual(page_url("docs/blog/new.html", "docs"), "/blog/new.html")
+
+    def test_normalize_tags(self):
+        self.assertEqual(normalize_tags(None), [])
+        self.assertEqual(normalize_tags("elves, dwarves,"), ["elves", "dwarves"])
+        self.assertEqual(normalize_tags(["elves", 3]), ["elves", "3"])
+
+    def test_page_entry_from_document(self):
+        document = markdown_to_document("---\ndate: 2024-01-31\ntags: elves\n---\n# Glorfindel\n\nBalrog slayer")
+        self.assertEqual(page_entry(document), {
+            "title": "Glorfindel",
+            "date": "2024-01-31",
+            "tags": ["elves"],
+            "word_count": 4,
+        })
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.dir, SITE_INDEX_NAME)
+
+    def entry(self, title, date=None, tags=()):
+        return {"title": title, "date": date, "tags": list(tags), "word_count": 1}
+
+    def test_round_trip(self):
+        index = SiteIndex.load(self.path)
+        self.assertEqual(len(index), 0)
+        index.update("content/a.md", "/a.html", self.entry("A", "2024-01-01"))
+        index.save()
+
+        index = SiteIndex.load(self.path)
+        self.assertIn("content/a.md", index)
+        self.assertEqual(index.pages["content/a.md"]["url"], "/a.html")
+
+    def test_prune_keeps_seen_and_kept_entries(self):
+        index = SiteIndex(self.path)
+        for name in ("a", "b", "c"):
+            index.update(f"content/{name}.md", f"/{name}.html", self.entry(name))
+        index.save()
+
+        index = SiteIndex.load(self.path)
+        index.keep("content/a.md")
+        index.update("content/b.md", "/b.html", self.entry("B"))
+        self.assertEqual(index.prune(), 1)
+        self.assertEqual(sorted(index.pages), ["content/a.md", "content/b.md"])
+
+    def test_remove_sources_under_directory(self):
+        index = SiteIndex(self.path)
+        index.update(os.path.join("content", "blog", "a.md"), "/blog/a.html", self.entry("A"))
+        index.update(os.path.join("content", "blogroll.md"), "/blogroll.html", self.entry("R"))
+        index.remove_sources(os.path.join("content", "blog"))
+        self.assertEqual(list(index.pages), [os.path.join("content", "blogroll.md")])
+
+    def test_entries_newest_first_and_tags(self):
+        index = SiteIndex(self.path)
+        index.update("content/old.md", "/old.html", self.entry("Old", "2023-01-01", ["elves"]))
+        index.update("content/new.md", "/new.html", self.entry("New", "2024-01-01", ["elves", "dwarves"]))
+        index.update("content/about.md", "/about.html", self.entry("About"))
+        self.assertEqual([e["title"] for e in index.entries()], ["New", "Old", "About"])
+        tags = index.tags()
+        self.assertEqual([e["title"] for e in tags["elves"]], ["New", "Old"])
+        self.assertEqual([e["title"] for e in tags["dwarves"]], ["New"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from testutil import TempDirTestCase
+from manifest import BuildManifest, MANIFEST_NAME
+from sync import needs_sync, sync_file, sync_tree
+
+
+class TestSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.dir, "static")
+        self.dest = os.path.join(self.dir, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png bytes")
+        self.manifest = BuildManifest(os.path.join(self.dest, MANIFEST_NAME))
+
+    def read(self, path):
+        with open(path, 'r') as f:
+            return f.read()
+
+    def test_first_sync_copies_everything(self):
+        copied, unchanged, stale = sync_tree(self.src, self.dest, self.manifest)
+        self.assertEqual((copied, unchanged, stale), (2, 0, []))
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "a.png")), "png bytes")
+
+    def test_second_sync_skips_unchanged(self):
+        sync_tree(self.src, self.dest, self.manifest)
+        copied, unchanged, _ = sync_tree(self.src, self.dest, BuildManifest(self.manifest.path))
+        self.assertEqual((copied, unchanged), (0, 2))
+
+    def test_changed_file_is_recopied(self):
+        sync_tree(self.src, self.dest, self.manifest)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        copied, unchanged, _ = sync_tree(self.src, self.dest, self.manifest)
+        self.assertEqual((copied, unchanged), (1, 1))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { color: red }")
+
+    def test_recopied_file_loses_compressed_siblings(self):
+        dest_path = os.path.join(self.dest, "index.css")
+        sync_file(os.path.join(self.src, "index.css"), dest_path)
+        self.write(dest_path + ".gz", b"stale")
+        sync_file(os.path.join(self.src, "index.css"), dest_path)
+        self.assertFalse(os.path.exists(dest_path + ".gz"))
+
+    def test_removed_source_reported_stale(self):
+        sync_tree(self.src, self.dest, self.manifest)
+        self.manifest.save()
+        os.remove(os.path.join(self.src, "index.css"))
+        manifest = BuildManifest.load(self.manifest.path)
+        _, _, stale = sync_tree(self.src, self.dest, manifest)
+        self.assertEqual(stale, [os.path.join(self.dest, "index.css")])
+
+    def test_checksum_detects_same_size_edit(self):
+        src_path = os.path.join(self.src, "index.css")
+        dest_path = os.path.join(self.dest, "index.css")
+        sync_file(src_path, dest_path)
+        self.write(dest_path, "body {!")
+        os.utime(dest_path, ns=(os.stat(src_path).st_atime_ns, os.stat(src_path).st_mtime_ns))
+        self.assertFalse(needs_sync(src_path, dest_path))
+        self.assertTrue(needs_sync(src_path, dest_path, checksum=True))
+
+    def test_hardlink_mode(self):
+        src_path = os.path.join(self.src, "index.css")
+        dest_path = os.path.join(self.dest, "index.css")
+        sync_file(src_path, dest_path, "hardlink")
+        self.assertEqual(self.read(dest_path), "body {}")
+        self.assertFalse(needs_sync(src_path, dest_path))
+
+    def test_reflink_mode(self):
+        src_path = os.path.join(self.src, "images", "a.png")
+        dest_path = os.path.join(self.dest, "images", "a.png")
+        sync_file(src_path, dest_path, "reflink")
+        self.assertEqual(self.read(dest_path), "png bytes")
+        self.assertFalse(needs_sync(src_path, dest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import unittest
+from htmlnode import LeafNode, Minifier, ParentNode
+from template import Template, load_template, minify_template_source, page_template
+from urls import make_url_resolver
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_placeholders(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        html = template.render_to_string(
+            {"Title": "Hello", "Content": ParentNode("p", [LeafNode(None, "text")])}
+        )
+        self.assertEqual(html, "<title>Hello</title><main><p>text</p></main>")
+
+    def test_unknown_placeholder_left_untouched(self):
+        template = Template("{{ Title }} {{ Unknown }}")
+        self.assertEqual(template.render_to_string({"Title": "T"}), "T {{ Unknown }}")
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render_to_string({"Title": "T"}), "T|T")
+
+    def test_basepath_applied_at_compile_time(self):
+        template = Template(
+            '<link href="/index.css" /><img src="/a.png" />{{ Content }}',
+            make_url_resolver("/site/"),
+        )
+        html = template.render_to_string({"Content": '<a href="/x">'})
+        self.assertEqual(html, '<link href="/site/index.css" /><img src="/site/a.png" /><a href="/x">')
+
+    def test_load_template_caches_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w') as f:
+                f.write("one {{ Title }}")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, 'w') as f:
+                f.write("two {{ Title }} changed")
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual(second.render_to_string({"Title": "T"}), "two T changed")
+
+
+    def test_minify_template_source(self):
+        source = """<!doctype html>
+<html>
+  <!-- page shell -->
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+  </head>
+  <body>
+    <p>Hello   <b>there</b></p>
+    <pre>keep
+   this</pre>
+  </body>
+</html>
+"""
+        self.assertEqual(
+            minify_template_source(source),
+            '<!doctype html><html><head><meta charset="utf-8"><title>{{ Title }}</title></head>'
+            '<body><p>Hello <b>there</b></p><pre>keep\n   this</pre></body></html>',
+        )
+
+    def test_minify_keeps_whitespace_between_inline_tags(self):
+        source = "<p>\n  <b>bold</b>\n  <i>italic</i>\n  <a href=\"/\">link</a>\n</p>\n<span>a</span>\n<div>b</div>"
+        self.assertEqual(minify_template_source(source),
+                         '<p><b>bold</b> <i>italic</i> <a href="/">link</a></p><span>a</span><div>b</div>')
+        self.assertEqual(minify_template_source("<b>a</b>\u00a0\u00a0<i>b</i>"), "<b>a</b>\u00a0\u00a0<i>b</i>")
+
+    def test_minified_render_counts_saved_bytes(self):
+        source = "<html>\n  <body>\u00e9 {{ Content }}</body>\n</html>\n"
+        template = Template(source, minify=True)
+        minifier = Minifier()
+        node = ParentNode("p", [LeafNode("a", "x", {"href": "/y"})])
+        buffer = io.StringIO()
+        template.render(buffer, {"Content": node}, minifier)
+        self.assertEqual(buffer.getvalue(), "<html><body>\u00e9 <p><a href=/y>x</a></p></body></html>")
+        unminified = Template(source).render_to_string({"Content": node})
+        self.assertEqual(minifier.saved, len(unminified.encode()) - len(buffer.getvalue().encode()))
+
+    def test_load_template_keys_on_minify(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w') as f:
+                f.write("<p>\n  {{ Title }}\n</p>")
+            self.assertIsNot(load_template(path), load_template(path, minify=True))
+            self.assertEqual(load_template(path, minify=True).render_to_string({"Title": "T"}), "<p> T </p>")
+
+    def test_page_template_from_front_matter(self):
+        self.assertEqual(page_template({}, "template.html"), "template.html")
+        self.assertEqual(page_template({"template": "post"}, os.path.join("site", "template.html")),
+                         os.path.join("site", "templates", "post.html"))
+        for name in ["../secret", "a/b", "", ["post"]]:
+            with self.assertRaises(ValueError):
+                page_template({"template": name}, "template.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,11 @@
+import random
 import unittest
 from textnode import TextNode, TextType
 from text_processing import (
     split_nodes_delimiter, 
-    extract_markdown_images, 
-    extract_markdown_links, 
     split_nodes_image, 
     split_nodes_link, 
+    split_delimiters,
     text_to_textnodes  # Add this import
 )
 # ... keep all existing TestSplitNodesDelimiter and TestExtractMarkdown tests ...
@@ -377,5 +377,67 @@ def test_text_to_textnodes_complex_nested_lookalike(self):
         ]
         self.assertListEqual(expected, nodes)
 
+def chained_text_to_textnodes(text):
+    """The original five-pass pipeline, kept as the reference for text_to_textnodes"""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+
+class TestSinglePassCompatibility(unittest.TestCase):
+    FRAGMENTS = [
+        "a", "word", " ", "**", "*", "_", "`", "[", "]", "(", ")", "!",
+        "![alt](img.png)", "[link](https://x.y)", "[](u)", "![]()", "\n",
+    ]
+
+    def assertSameAsChained(self, text):
+        try:
+            expected = chained_text_to_textnodes(text)
+        except ValueError:
+            with self.assertRaises(ValueError, msg=repr(text)):
+                text_to_textnodes(text)
+            return
+        self.assertListEqual(expected, text_to_textnodes(text), msg=repr(text))
+
+    def test_known_inputs(self):
+        inputs = [
+            "",
+            "plain text",
+            "This is **text** with an _italic_ word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "****",
+            "a__b",
+            "**bold with _underscores_ inside**",
+            "_italic with `ticks` inside_",
+            "`code with _underscore_`",
+            "_italic **bold** italic_",
+            "**unclosed",
+            "![image](img.png)[link](url)![image](img.png)",
+            "!![x](y) and ![x]b [c](d)",
+            "[a](b![c](d)",
+            "[](![![\n)]()[",
+        ]
+        for text in inputs:
+            self.assertSameAsChained(text)
+
+    def test_fuzz_against_chained_pipeline(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            count = rng.randint(0, 16)
+            text = "".join(rng.choice(self.FRAGMENTS) for _ in range(count))
+            self.assertSameAsChained(text)
+
+    def test_split_delimiters_range(self):
+        nodes = split_delimiters("xx**b**_i_yy", [], 2, 10)
+        self.assertListEqual(
+            [TextNode("b", TextType.BOLD), TextNode("i", TextType.ITALIC)],
+            nodes,
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
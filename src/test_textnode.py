@@ -1,6 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType, text_node_to_html_node
+from urls import make_url_resolver
 
 
 class TestTextNode(unittest.TestCase):
@@ -31,6 +32,12 @@ class TestTextNode(unittest.TestCase):
         )
 
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.url, None)
+
+
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
@@ -54,6 +61,22 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
 
+    def test_link_url_resolved(self):
+        node = TextNode("home", TextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, make_url_resolver("/site/"))
+        self.assertEqual(html_node.props, {"href": "/site/blog/tom"})
+
+    def test_image_url_resolved(self):
+        node = TextNode("alt", TextType.IMAGE, "/images/a.png")
+        html_node = text_node_to_html_node(node, make_url_resolver("/site/"))
+        self.assertEqual(html_node.props, {"src": "/site/images/a.png", "alt": "alt"})
+
+    def test_external_urls_not_resolved(self):
+        resolve_url = make_url_resolver("/site/")
+        for url in ["https://www.boot.dev", "//cdn.example.com/a.png", "relative/page", "#top"]:
+            node = TextNode("link", TextType.LINK, url)
+            self.assertEqual(text_node_to_html_node(node, resolve_url).props, {"href": url})
+
 
 if __name__ == "__main__":
     unittest.main()
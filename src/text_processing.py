@@ -1,17 +1,21 @@
 import re
 from textnode import TextNode, TextType
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+DELIMITER_TEXT_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+# Bold spans are split out first, then italic, then code, so inside a span any
+# delimiter of a later pass is plain text, while an earlier one leaves it unmatched
+DELIMITER_PRECEDENCE = {"**": 0, "_": 1, "`": 2}
+
 def extract_markdown_images(text):
     """Extract markdown images from text and return list of (alt_text, url) tuples"""
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
     """Extract markdown links from text and return list of (anchor_text, url) tuples"""
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -127,21 +131,76 @@ def split_nodes_link(old_nodes):
     
     return new_nodes
 
+def split_delimiters(text, nodes, start=0, end=None):
+    """
+    Scan text[start:end] once for bold, italic and code delimiters, appending
+    the resulting TextNodes to nodes. Empty spans are dropped, and unmatched
+    delimiters raise ValueError just like split_nodes_delimiter.
+    """
+    if end is None:
+        end = len(text)
+    open_delimiter = None
+    span_start = start
+    for match in INLINE_DELIMITER_PATTERN.finditer(text, start, end):
+        delimiter = match.group()
+        if open_delimiter is None:
+            if match.start() > span_start:
+                nodes.append(TextNode(text[span_start:match.start()], TextType.TEXT))
+            open_delimiter = delimiter
+            span_start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > span_start:
+                nodes.append(TextNode(text[span_start:match.start()], DELIMITER_TEXT_TYPES[delimiter]))
+            open_delimiter = None
+            span_start = match.end()
+        elif DELIMITER_PRECEDENCE[delimiter] < DELIMITER_PRECEDENCE[open_delimiter]:
+            # An outer delimiter ends the text the open span lives in
+            raise ValueError(f"Invalid markdown: unmatched delimiter '{open_delimiter}' in text: {text[start:end]}")
+
+    if open_delimiter is not None:
+        raise ValueError(f"Invalid markdown: unmatched delimiter '{open_delimiter}' in text: {text[start:end]}")
+    if end > span_start:
+        nodes.append(TextNode(text[span_start:end], TextType.TEXT))
+    return nodes
+
+def split_links(text, nodes, start=0, end=None):
+    """
+    Scan text[start:end] for links, appending LINK nodes and delimiter-split
+    text between them to nodes.
+    """
+    if end is None:
+        end = len(text)
+    position = start
+    for match in LINK_PATTERN.finditer(text, start, end):
+        if match.start() > position:
+            split_delimiters(text, nodes, position, match.start())
+        anchor_text, url = match.groups()
+        nodes.append(TextNode(anchor_text, TextType.LINK, url))
+        position = match.end()
+    if end > position:
+        split_delimiters(text, nodes, position, end)
+    return nodes
+
 def text_to_textnodes(text):
-    """Convert raw markdown text to a list of TextNodes by applying all splitting functions in order"""
-    # Start with a single text node
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Apply splitting functions in order of precedence
-    # Images first (since they have ! prefix and shouldn't be confused with links)
-    nodes = split_nodes_image(nodes)
-    
-    # Links second
-    nodes = split_nodes_link(nodes)
-    
-    # Then inline formatting in order of common markdown precedence
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)  # Changed from "*" to "_"
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
+    """
+    Convert raw markdown text to a list of TextNodes in a single left-to-right scan.
+    The result is the same as running split_nodes_image, split_nodes_link and the
+    bold, italic and code split_nodes_delimiter passes in that order, but each
+    stretch of text is only scanned by the pattern that applies to it.
+    """
+    if not text:
+        return [TextNode(text, TextType.TEXT)]
+
+    nodes = []
+    position = 0
+    # Images take precedence, so links are only looked for between them
+    for match in IMAGE_PATTERN.finditer(text):
+        if match.start() > position:
+            split_links(text, nodes, position, match.start())
+        alt_text, url = match.groups()
+        nodes.append(TextNode(alt_text, TextType.IMAGE, url))
+        position = match.end()
+
+    if position < len(text):
+        split_links(text, nodes, position)
     return nodes
@@ -12,6 +12,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -28,7 +30,12 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolve_url=None, images=None):
+    """
+    Convert a TextNode to a LeafNode. Link and image URLs are passed through
+    resolve_url, when given, so no rewriting of the serialized page is needed.
+    With an ImageCatalog, images also get their size, lazy loading and srcset.
+    """
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     if text_node.text_type == TextType.BOLD:
@@ -38,7 +45,12 @@ def text_node_to_html_node(text_node):
     if text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        return LeafNode("a", text_node.text, {"href": url})
     if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        props = {"src": url, "alt": text_node.text}
+        if images is not None:
+            props.update(images.attributes(text_node.url, resolve_url))
+        return LeafNode("img", "", props)
     raise ValueError(f"invalid text type: {text_node.text_type}")
@@ -0,0 +1,11 @@
+def make_url_resolver(basepath="/"):
+    """
+    Return a function that maps root-relative URLs ("/images/a.png") onto
+    the basepath the site is served from. Relative, absolute and
+    protocol-relative ("//host/...") URLs are returned unchanged.
+    """
+    def resolve_url(url):
+        if url.startswith("/") and not url.startswith("//"):
+            return basepath + url[1:]
+        return url
+    return resolve_url